@@ -0,0 +1,81 @@
+"""
+Micro-benchmarks for simulation.py.
+
+Run with `python3 bench_simulation.py` from this directory.
+"""
+import timeit
+from datetime import datetime, timezone
+
+from simulation import parse_ts, simulate_coding_framework, _TS_FORMAT
+
+
+def _strptime_ts(ts: str) -> int:
+    # The original parse_ts, kept here as the baseline.
+    dt = datetime.strptime(ts, _TS_FORMAT).replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def bench_parse_ts(n: int = 200_000, distinct: int = 50) -> None:
+    stamps = [f"2021-07-01T12:{i % 60:02d}:{i // 60 % 60:02d}" for i in range(distinct)]
+    stream = [stamps[i % distinct] for i in range(n)]
+    assert all(parse_ts(ts) == _strptime_ts(ts) for ts in stamps)
+
+    def run(fn):
+        return min(timeit.repeat(lambda: [fn(ts) for ts in stream], number=1, repeat=3))
+
+    baseline = run(_strptime_ts)
+    cached = run(parse_ts)
+    uncached = run(parse_ts.__wrapped__)
+    print(f"parse_ts over {n} timestamps ({distinct} distinct)")
+    print(f"  strptime        {baseline * 1e9 / n:8.0f} ns/op")
+    print(f"  fast, no cache  {uncached * 1e9 / n:8.0f} ns/op")
+    print(f"  fast + lru      {cached * 1e9 / n:8.0f} ns/op")
+
+
+_COMMANDS = ["FILE_UPLOAD", "FILE_GET", "FILE_COPY", "FILE_SEARCH",
+             "FILE_UPLOAD_AT", "FILE_GET_AT", "FILE_COPY_AT", "FILE_SEARCH_AT", "ROLLBACK"]
+
+
+def _chain_dispatch(cmd: str) -> int:
+    # The shape of the original if/elif dispatcher.
+    if cmd == "FILE_UPLOAD":
+        return 0
+    elif cmd == "FILE_GET":
+        return 1
+    elif cmd == "FILE_COPY":
+        return 2
+    elif cmd == "FILE_SEARCH":
+        return 3
+    elif cmd == "FILE_UPLOAD_AT":
+        return 4
+    elif cmd == "FILE_GET_AT":
+        return 5
+    elif cmd == "FILE_COPY_AT":
+        return 6
+    elif cmd == "FILE_SEARCH_AT":
+        return 7
+    elif cmd == "ROLLBACK":
+        return 8
+    raise RuntimeError(f"Unknown operation: {cmd}")
+
+
+def bench_dispatch(n: int = 1_000_000) -> None:
+    table = {cmd: (lambda i: lambda: i)(i) for i, cmd in enumerate(_COMMANDS)}
+    print(f"dispatch overhead over {n} ops")
+    for cmd in ("FILE_UPLOAD", "FILE_SEARCH_AT", "ROLLBACK"):
+        # Fresh str objects, as decoded commands would be, so `==` cannot
+        # short-circuit on identity.
+        stream = [cmd.encode().decode() for _ in range(n)]
+        chain = min(timeit.repeat(lambda: [_chain_dispatch(c) for c in stream], number=1, repeat=3))
+        lookup = min(timeit.repeat(lambda: [table[c]() for c in stream], number=1, repeat=3))
+        print(f"  {cmd:15} if/elif {chain * 1e9 / n:6.0f} ns/op   table {lookup * 1e9 / n:6.0f} ns/op")
+
+    ops = [["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb"]]
+    ops += [["FILE_GET_AT", "2021-07-01T12:00:00", "a.txt"] for _ in range(n // 10)]
+    total = min(timeit.repeat(lambda: simulate_coding_framework(ops), number=1, repeat=3))
+    print(f"  simulate_coding_framework, FILE_GET_AT  {total * 1e9 / len(ops):6.0f} ns/op")
+
+
+if __name__ == "__main__":
+    bench_parse_ts()
+    bench_dispatch()
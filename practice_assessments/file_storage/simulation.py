@@ -1,24 +1,258 @@
+from bisect import bisect_right
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
 from datetime import datetime, timezone
+from functools import lru_cache, partial
+from operator import itemgetter
+from itertools import count, islice
+import heapq
+import json
 import re
+from types import SimpleNamespace
+
+from sortedcontainers import SortedList
 
 _SIZE_RE = re.compile(r"^\s*(\d+)\s*([a-zA-Z]*)\s*$")
 
+# Prefixes up to this length get a pre-sorted by-size list in _PrefixIndex.
+_RANKED_DEPTH = 2
+
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Command streams reuse a handful of timestamps over and over.
+_TS_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_TS_CACHE_SIZE)
+def parse_ts(ts: str) -> int:
+    """
+    Converts a `%Y-%m-%dT%H:%M:%S` UTC timestamp to epoch seconds.
+
+    Zero-padded input is sliced directly instead of going through
+    `datetime.strptime`; anything else falls back to strptime, which
+    also produces the ValueError for malformed input.
+    """
+    if len(ts) == 19 and ts[4] == "-" and ts[7] == "-" and ts[10] == "T" and ts[13] == ":" and ts[16] == ":":
+        digits = ts[0:4] + ts[5:7] + ts[8:10] + ts[11:13] + ts[14:16] + ts[17:19]
+        if digits.isascii() and digits.isdigit():
+            dt = datetime(int(ts[0:4]), int(ts[5:7]), int(ts[8:10]),
+                          int(ts[11:13]), int(ts[14:16]), int(ts[17:19]), tzinfo=timezone.utc)
+            return int(dt.timestamp())
+    dt = datetime.strptime(ts, _TS_FORMAT).replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
 
-@dataclass
+@dataclass(slots=True)
 class FileObj:
-    size: str
+    size: str                       # as given, e.g. "200kb"
+    size_bytes: int                 # `size` parsed once at upload
     created_at: int                 # epoch seconds
     ttl_seconds: Optional[int]      # None = infinite
+    epoch: int = 0                  # ROLLBACKs done before the upload
+
+
+class _PrefixIndex:
+    """
+    Sorted index of file names, so a prefix lookup only touches the
+    names that actually start with the prefix instead of the whole store.
+
+    Short prefixes (up to _RANKED_DEPTH characters, e.g. "" or "a") match
+    most of the store, so for those a (-size, name) ordered list is kept
+    up to date as well and a size-ranked top-k is just its first k
+    entries. Longer prefixes select few names and use a bounded heap.
+    """
+
+    def __init__(self):
+        self._names = SortedList()
+        self._sizes: Dict[str, int] = {}
+        self._ranked: Dict[str, SortedList] = defaultdict(SortedList)
+
+    def add(self, name: str, size: int) -> None:
+        self._names.add(name)
+        self._sizes[name] = size
+        # One entry shared by every ranked list the name is in.
+        entry = (-size, name)
+        for i in range(min(len(name), _RANKED_DEPTH) + 1):
+            self._ranked[name[:i]].add(entry)
+
+    def discard(self, name: str) -> None:
+        size = self._sizes.pop(name, None)
+        if size is None:
+            return
+        self._names.remove(name)
+        entry = (-size, name)
+        for i in range(min(len(name), _RANKED_DEPTH) + 1):
+            self._ranked[name[:i]].remove(entry)
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """Yields the names starting with `prefix` in alphabetical order."""
+        return _iter_prefix(self._names, prefix)
+
+    def top_by_size(self, prefix: str, k: int) -> List[str]:
+        """
+        Returns up to `k` names starting with `prefix`,
+        ordered by size desc, then name asc.
+        """
+        if len(prefix) <= _RANKED_DEPTH:
+            ranked = self._ranked.get(prefix)
+            return [name for _, name in ranked.islice(stop=k)] if ranked else []
+
+        sizes = self._sizes
+        best = heapq.nsmallest(k, ((-sizes[name], name) for name in self.iter_prefix(prefix)))
+        return [name for _, name in best]
+
+
+def _iter_prefix(names: SortedList, prefix: str) -> Iterator[str]:
+    for name in names.irange(minimum=prefix):
+        if not name.startswith(prefix):
+            return
+        yield name
+
+
+class _ExpiryQueue:
+    """
+    Files with a TTL, split around a movable clock: `_live` is a min-heap
+    of the entries whose key (expiry time, in whatever frame the caller
+    measures the clock) is after the clock and `_expired` a max-heap of
+    the rest. Moving the clock only pops the
+    entries whose key lies between the old and the new clock, so the
+    cost is proportional to the files that changed state.
+
+    Each entry carries a sequence number, and `current` (shared by every
+    queue of one simulation) maps a name to the number of its latest
+    entry. Entries whose name has since been written again, even with
+    the same FileObj, are dropped when they reach the top of a heap.
+    """
+
+    def __init__(self, current: Dict[str, int], seq: Iterator[int]):
+        self._current = current
+        self._live: List[Tuple[int, int, str, FileObj]] = []
+        self._expired: List[Tuple[int, int, str, FileObj]] = []
+        self._seq = seq  # also the tie-breaker, FileObj is not orderable
+        self.clock = float("-inf")
+
+    def push(self, key: int, name: str, obj: FileObj) -> bool:
+        """Tracks `obj` stored under `name`; returns whether it is live."""
+        seq = self._current[name] = next(self._seq)
+        if key > self.clock:
+            heapq.heappush(self._live, (key, seq, name, obj))
+            return True
+        heapq.heappush(self._expired, (-key, seq, name, obj))
+        return False
+
+    def drain(self) -> List[Tuple[int, str, FileObj]]:
+        """Removes and returns every (key, name, obj) entry still current."""
+        current = self._current
+        entries = [(key, name, obj) for key, seq, name, obj in self._live if current.get(name) == seq]
+        entries += [(-neg_key, name, obj) for neg_key, seq, name, obj in self._expired if current.get(name) == seq]
+        self._live.clear()
+        self._expired.clear()
+        return entries
+
+    def move_to(self, clock: int) -> Tuple[List[str], List[str]]:
+        """
+        Moves the clock, returning the names that expired and the names
+        that became live again (the clock may move backwards).
+        """
+        current = self._current
+        expired: List[str] = []
+        revived: List[str] = []
+
+        while self._live and self._live[0][0] <= clock:
+            key, seq, name, obj = heapq.heappop(self._live)
+            if current.get(name) == seq:
+                heapq.heappush(self._expired, (-key, seq, name, obj))
+                expired.append(name)
+
+        while self._expired and -self._expired[0][0] > clock:
+            neg_key, seq, name, obj = heapq.heappop(self._expired)
+            if current.get(name) == seq:
+                heapq.heappush(self._live, (-neg_key, seq, name, obj))
+                revived.append(name)
+
+        self.clock = clock
+        return expired, revived
+
+
+# Commands added through register_command, on top of the built-in ones.
+_extra_commands: Dict[str, Callable[[SimpleNamespace, Sequence], str]] = {}
+
+
+def register_command(cmd: str):
+    """
+    Decorator registering a handler for a new command name. The handler
+    is called as `handler(core, op)` and returns the output line, where
+    `core` exposes the simulation's upload / get / copy / search /
+    rollback / get_version / restore_all operations and `op` is the raw
+    command list. A registered name takes precedence over a built-in
+    command of the same name.
+
+        @register_command("FILE_EXISTS")
+        def file_exists(core, op):
+            return "yes" if core.get(at_ts=0, name=op[1]) else "no"
+    """
+    def decorator(handler):
+        _extra_commands[cmd] = handler
+        return handler
+    return decorator
 
 
 def simulate_coding_framework(list_of_lists):
+    return list(iter_simulate_coding_framework(list_of_lists))
+
+
+def iter_simulate_coding_framework(commands: Iterable[Sequence]) -> Iterator[str]:
+    """
+    Streaming form of `simulate_coding_framework`: consumes `commands`
+    lazily and yields each output line as soon as its command has run,
+    so a command log never has to be held in memory.
+    """
     db_files: Dict[str, FileObj] = {}
+    # Names of the files alive at index_clock, the latest time searched so
+    # far, kept sorted for FILE_SEARCH / FILE_SEARCH_AT. Expired files stay
+    # in db_files since *_AT commands may go back in time, but searches at
+    # or after index_clock no longer see them.
+    name_index = _PrefixIndex()
+    index_clock = float("-inf")
+    # Every name in db_files, for the rarer searches before index_clock,
+    # which filter the prefix range with is_alive instead of moving the
+    # index back. Built by the first such search, so a store that is only
+    # searched forward in time never pays for it.
+    stored_names: Optional[SortedList] = None
+    # Every FileObj stored under each name, by write time, minus the
+    # versions a RESTORE discarded. FileObjs are never mutated, so past
+    # versions share them with db_files. A name written once, the common
+    # case, only maps to its write time, its FileObj being db_files[name];
+    # a second version turns that into a list of (write time, FileObj).
+    # A name is in history exactly when it is in db_files.
+    history: Dict[str, Union[int, List[Tuple[int, FileObj]]]] = {}
+    # The names written at each write time, so RESTORE visits only the
+    # names with a version after its timestamp.
+    written_at: Dict[int, List[str]] = {}
+    write_times = SortedList()
 
     # After rollback, Level 4 tests expect FILE_SEARCH_AT to be alphabetical.
     rollback_mode = False
 
+    # ROLLBACK resets the TTL base of every file to its timestamp. Rather
+    # than rewriting each FileObj, count rollbacks and remember the last
+    # timestamp: a file uploaded before the last rollback (obj.epoch <
+    # rollback_epoch) counts as created at rollback_base.
+    rollback_epoch = 0
+    rollback_base = 0
+
+    # Expiry keys of files created in the current epoch are absolute
+    # (created_at + ttl), those of older files are just their ttl, relative
+    # to rollback_base, so a rollback leaves both orders intact.
+    # Sequence number of the expiry entry tracking each TTL name.
+    expiry_entries: Dict[str, int] = {}
+    expiry_seq = count()
+    expiring = _ExpiryQueue(expiry_entries, expiry_seq)
+    expiring_rolled = _ExpiryQueue(expiry_entries, expiry_seq)
+    # Rollback count at the last sync_index; files in `expiring` from an
+    # older epoch are moved to `expiring_rolled` on the next sync.
+    synced_epoch = 0
+
     def convert_file_size(size_str: str) -> int:
         s = str(size_str)
         m = _SIZE_RE.match(s)
@@ -36,14 +270,88 @@ def simulate_coding_framework(list_of_lists):
             return value
         raise ValueError(f"Unknown size unit: {size_str!r}")
 
-    def parse_ts(ts: str) -> int:
-        dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
-        return int(dt.timestamp())
+    def created_at(obj: FileObj) -> int:
+        return rollback_base if obj.epoch < rollback_epoch else obj.created_at
 
     def is_alive(at_ts: int, obj: FileObj) -> bool:
         if obj.ttl_seconds is None:
             return True
-        return at_ts < (obj.created_at + obj.ttl_seconds)
+        return at_ts < (created_at(obj) + obj.ttl_seconds)
+
+    def track(name: str, obj: FileObj) -> None:
+        if obj.ttl_seconds is None:
+            live = True
+        elif obj.epoch < rollback_epoch:
+            live = expiring_rolled.push(obj.ttl_seconds, name, obj)
+        else:
+            live = expiring.push(obj.created_at + obj.ttl_seconds, name, obj)
+        if live:
+            name_index.add(name, obj.size_bytes)
+
+    def store(name: str, obj: FileObj) -> None:
+        old = db_files.get(name)
+        if old is obj:
+            # e.g. a file copied onto itself: its index and expiry state hold.
+            return
+        if old is None:
+            if stored_names is not None:
+                stored_names.add(name)
+        else:
+            name_index.discard(name)
+            expiry_entries.pop(name, None)
+        db_files[name] = obj
+        track(name, obj)
+
+    def versions_of(name: str) -> List[Tuple[int, FileObj]]:
+        versions = history[name]
+        if isinstance(versions, int):
+            versions = history[name] = [(versions, db_files[name])]
+        return versions
+
+    def version_at(name: str, at_ts: int) -> Optional[FileObj]:
+        # A single bisect over the versions of `name`.
+        versions = history.get(name)
+        if versions is None:
+            return None
+        if isinstance(versions, int):
+            return db_files[name] if versions <= at_ts else None
+        i = bisect_right(versions, at_ts, key=itemgetter(0))
+        return versions[i - 1][1] if i else None
+
+    def write(at_ts: int, name: str, obj: FileObj) -> None:
+        if name not in history:
+            history[name] = at_ts
+        else:
+            versions = versions_of(name)
+            # *_AT writes may arrive out of order; equal times keep write order.
+            versions.insert(bisect_right(versions, at_ts, key=itemgetter(0)), (at_ts, obj))
+        names = written_at.get(at_ts)
+        if names is None:
+            names = written_at[at_ts] = []
+            write_times.add(at_ts)
+        names.append(name)
+        store(name, obj)
+
+    def sync_index(at_ts: int) -> None:
+        nonlocal synced_epoch
+        moves = [expiring_rolled.move_to(at_ts - rollback_base)]
+        if synced_epoch != rollback_epoch:
+            # Files from before the last rollback switch to a ttl key. The
+            # rest go back in unchanged, so their index state still holds.
+            for key, name, obj in expiring.drain():
+                if obj.epoch < rollback_epoch:
+                    name_index.discard(name)
+                    track(name, obj)
+                else:
+                    expiring.push(key, name, obj)
+            synced_epoch = rollback_epoch
+        moves.append(expiring.move_to(at_ts))
+
+        for expired, revived in moves:
+            for name in expired:
+                name_index.discard(name)
+            for name in revived:
+                name_index.add(name, db_files[name].size_bytes)
 
     # ---------- Core ops (parameterized by an "effective time") ----------
 
@@ -51,7 +359,8 @@ def simulate_coding_framework(list_of_lists):
         # Duplicate only if an existing file is alive at that time.
         if name in db_files and is_alive(at_ts, db_files[name]):
             raise RuntimeError(f"File {name} already exists")
-        db_files[name] = FileObj(size=size, created_at=at_ts, ttl_seconds=ttl)
+        write(at_ts, name, FileObj(size=size, size_bytes=convert_file_size(size),
+                                   created_at=at_ts, ttl_seconds=ttl, epoch=rollback_epoch))
 
     def get(at_ts: int, name: str) -> Optional[FileObj]:
         obj = db_files.get(name)
@@ -63,103 +372,186 @@ def simulate_coding_framework(list_of_lists):
         src_obj = get(at_ts, src)
         if src_obj is None:
             raise RuntimeError(f"Source files {src} does not exist.")
-        # Copy inherits same TTL behavior as source (same created_at + ttl_seconds)
-        db_files[dest] = FileObj(size=src_obj.size, created_at=src_obj.created_at, ttl_seconds=src_obj.ttl_seconds)
+        # Copy inherits same TTL behavior as source (same created_at + ttl_seconds),
+        # so it can share the source's FileObj, which is never mutated.
+        write(at_ts, dest, src_obj)
 
     def search(at_ts: int, prefix: str, *, alphabetical_only: bool) -> List[str]:
+        nonlocal index_clock, stored_names
+        # The index only moves forward (or to a new rollback state), so a
+        # search mix going back and forth in time never churns it.
+        index_clock = max(index_clock, at_ts)
+        sync_index(index_clock)
+        if at_ts < index_clock:
+            if stored_names is None:
+                stored_names = SortedList(db_files)
+            names = (name for name in _iter_prefix(stored_names, prefix) if is_alive(at_ts, db_files[name]))
+            if alphabetical_only:
+                return list(islice(names, 10))
+            best = heapq.nsmallest(10, ((-db_files[name].size_bytes, name) for name in names))
+            return [name for _, name in best]
+
+        # name_index holds exactly the files alive at at_ts.
         if alphabetical_only:
-            names = [
-                name for name, obj in db_files.items()
-                if name.startswith(prefix) and is_alive(at_ts, obj)
-            ]
-            names.sort()
-            return names[:10]
-
-        sized: List[Tuple[str, int]] = []
-        for name, obj in db_files.items():
-            if name.startswith(prefix) and is_alive(at_ts, obj):
-                sized.append((name, convert_file_size(obj.size)))
+            return list(islice(name_index.iter_prefix(prefix), 10))
 
         # size desc, then name asc
-        sized.sort(key=lambda item: (-item[1], item[0]))
-        return [name for name, _ in sized[:10]]
+        return name_index.top_by_size(prefix, 10)
 
     def rollback(ts_str: str) -> None:
-        nonlocal rollback_mode
+        nonlocal rollback_mode, rollback_epoch, rollback_base
         rollback_mode = True
-        t = parse_ts(ts_str)
-        # Reset TTL base time for all files
-        for obj in db_files.values():
-            obj.created_at = t
+        # Reset TTL base time for all files (see created_at)
+        rollback_base = parse_ts(ts_str)
+        rollback_epoch += 1
 
-    # ---------- Dispatcher / Outputs ----------
+    def get_version(at_ts: int, name: str) -> Optional[FileObj]:
+        # The file as stored under `name` at at_ts, ignoring later writes.
+        obj = version_at(name, at_ts)
+        if obj is None or not is_alive(at_ts, obj):
+            return None
+        return obj
 
-    out: List[str] = []
-
-    for op in list_of_lists:
-        cmd = op[0]
-
-        if cmd == "FILE_UPLOAD":
-            # ["FILE_UPLOAD", name, size]
-            name, size = op[1], op[2]
-            upload(at_ts=0, name=name, size=size, ttl=None)  # non-time ops: infinite
-            out.append(f"uploaded {name}")
-
-        elif cmd == "FILE_GET":
-            # ["FILE_GET", name]
-            name = op[1]
-            obj = get(at_ts=0, name=name)
-            out.append("file not found" if obj is None else f"got {name}")
-
-        elif cmd == "FILE_COPY":
-            # ["FILE_COPY", src, dest]
-            src, dest = op[1], op[2]
-            copy(at_ts=0, src=src, dest=dest)
-            out.append(f"copied {src} to {dest}")
-
-        elif cmd == "FILE_SEARCH":
-            # ["FILE_SEARCH", prefix]
-            prefix = op[1]
-            names = search(at_ts=0, prefix=prefix, alphabetical_only=False)
-            # Non-AT search output (group 2): "found [..]"
-            out.append("found [" + ", ".join(names) + "]")
-
-        elif cmd == "FILE_UPLOAD_AT":
-            # ["FILE_UPLOAD_AT", ts, name, size] or ["FILE_UPLOAD_AT", ts, name, size, ttl]
-            ts_str, name, size = op[1], op[2], op[3]
-            ttl = int(op[4]) if len(op) == 5 else None
-            upload(at_ts=parse_ts(ts_str), name=name, size=size, ttl=ttl)
-            out.append(f"uploaded at {name}")
-
-        elif cmd == "FILE_GET_AT":
-            # ["FILE_GET_AT", ts, name]
-            ts_str, name = op[1], op[2]
-            obj = get(at_ts=parse_ts(ts_str), name=name)
-            out.append("file not found" if obj is None else f"got at {name}")
-
-        elif cmd == "FILE_COPY_AT":
-            # ["FILE_COPY_AT", ts, src, dest]
-            ts_str, src, dest = op[1], op[2], op[3]
-            copy(at_ts=parse_ts(ts_str), src=src, dest=dest)
-            out.append(f"copied at {src} to {dest}")
-
-        elif cmd == "FILE_SEARCH_AT":
-            # ["FILE_SEARCH_AT", ts, prefix]
-            ts_str, prefix = op[1], op[2]
-            names = search(
-                at_ts=parse_ts(ts_str),
-                prefix=prefix,
-                alphabetical_only=rollback_mode  # Level 4 expectation
-            )
-            out.append("found at [" + ", ".join(names) + "]")
-
-        elif cmd == "ROLLBACK":
-            # ["ROLLBACK", ts]
-            ts_str = op[1]
-            rollback(ts_str)
-            out.append(f"rollback to {ts_str}")
+    def restore_all(ts_str: str) -> None:
+        # Discards every version written after ts, as if those writes had
+        # never happened, and puts each name they touched back to its
+        # latest remaining version (or removes it). GET_VERSION_AT and
+        # later restores see the same discarded history. Each version is
+        # discarded at most once, so a restore costs O(log versions) per
+        # version it discards rather than a walk over every name.
+        t = parse_ts(ts_str)
+        cut = write_times.bisect_right(t)
+        changed = dict.fromkeys(name for at_ts in write_times[cut:] for name in written_at.pop(at_ts))
+        del write_times[cut:]
+        for name in changed:
+            versions = history[name]
+            if isinstance(versions, int):
+                # Its only version is after ts.
+                versions = []
+            else:
+                del versions[bisect_right(versions, t, key=itemgetter(0)):]
+            if not versions:
+                del history[name]
+                name_index.discard(name)
+                if stored_names is not None:
+                    stored_names.remove(name)
+                expiry_entries.pop(name, None)
+                del db_files[name]
+                continue
+            store(name, versions[-1][1])
+            if len(versions) == 1:
+                history[name] = versions[0][0]
+
+    # ---------- Command handlers ----------
+
+    def file_upload(op) -> str:
+        # ["FILE_UPLOAD", name, size]
+        name, size = op[1], op[2]
+        upload(at_ts=0, name=name, size=size, ttl=None)  # non-time ops: infinite
+        return f"uploaded {name}"
+
+    def file_get(op) -> str:
+        # ["FILE_GET", name]
+        name = op[1]
+        obj = get(at_ts=0, name=name)
+        return "file not found" if obj is None else f"got {name}"
+
+    def file_copy(op) -> str:
+        # ["FILE_COPY", src, dest]
+        src, dest = op[1], op[2]
+        copy(at_ts=0, src=src, dest=dest)
+        return f"copied {src} to {dest}"
+
+    def file_search(op) -> str:
+        # ["FILE_SEARCH", prefix]
+        prefix = op[1]
+        names = search(at_ts=0, prefix=prefix, alphabetical_only=False)
+        # Non-AT search output (group 2): "found [..]"
+        return "found [" + ", ".join(names) + "]"
+
+    def file_upload_at(op) -> str:
+        # ["FILE_UPLOAD_AT", ts, name, size] or ["FILE_UPLOAD_AT", ts, name, size, ttl]
+        ts_str, name, size = op[1], op[2], op[3]
+        ttl = int(op[4]) if len(op) == 5 else None
+        upload(at_ts=parse_ts(ts_str), name=name, size=size, ttl=ttl)
+        return f"uploaded at {name}"
+
+    def file_get_at(op) -> str:
+        # ["FILE_GET_AT", ts, name]
+        ts_str, name = op[1], op[2]
+        obj = get(at_ts=parse_ts(ts_str), name=name)
+        return "file not found" if obj is None else f"got at {name}"
+
+    def file_copy_at(op) -> str:
+        # ["FILE_COPY_AT", ts, src, dest]
+        ts_str, src, dest = op[1], op[2], op[3]
+        copy(at_ts=parse_ts(ts_str), src=src, dest=dest)
+        return f"copied at {src} to {dest}"
+
+    def file_search_at(op) -> str:
+        # ["FILE_SEARCH_AT", ts, prefix]
+        ts_str, prefix = op[1], op[2]
+        names = search(
+            at_ts=parse_ts(ts_str),
+            prefix=prefix,
+            alphabetical_only=rollback_mode  # Level 4 expectation
+        )
+        return "found at [" + ", ".join(names) + "]"
+
+    def rollback_cmd(op) -> str:
+        # ["ROLLBACK", ts]
+        ts_str = op[1]
+        rollback(ts_str)
+        return f"rollback to {ts_str}"
+
+    def file_get_version_at(op) -> str:
+        # ["FILE_GET_VERSION_AT", ts, name]
+        ts_str, name = op[1], op[2]
+        obj = get_version(at_ts=parse_ts(ts_str), name=name)
+        return "file not found" if obj is None else f"got version at {name}"
+
+    def restore_cmd(op) -> str:
+        # ["RESTORE", ts]
+        ts_str = op[1]
+        restore_all(ts_str)
+        return f"restored to {ts_str}"
 
-        else:
-            raise RuntimeError(f"Unknown operation: {cmd}")
+    # ---------- Dispatcher / Outputs ----------
 
-    return out
+    handlers: Dict[str, Callable[[Sequence], str]] = {
+        "FILE_UPLOAD": file_upload,
+        "FILE_GET": file_get,
+        "FILE_COPY": file_copy,
+        "FILE_SEARCH": file_search,
+        "FILE_UPLOAD_AT": file_upload_at,
+        "FILE_GET_AT": file_get_at,
+        "FILE_COPY_AT": file_copy_at,
+        "FILE_SEARCH_AT": file_search_at,
+        "ROLLBACK": rollback_cmd,
+        "FILE_GET_VERSION_AT": file_get_version_at,
+        "RESTORE": restore_cmd,
+    }
+    if _extra_commands:
+        core = SimpleNamespace(upload=upload, get=get, copy=copy, search=search, rollback=rollback,
+                               get_version=get_version, restore_all=restore_all)
+        for cmd, handler in _extra_commands.items():
+            handlers[cmd] = partial(handler, core)
+
+    for op in commands:
+        handler = handlers.get(op[0])
+        if handler is None:
+            raise RuntimeError(f"Unknown operation: {op[0]}")
+        yield handler(op)
+
+
+def iter_jsonl_commands(lines: Iterable[str]) -> Iterator[list]:
+    """
+    Decodes one command per line of a JSONL stream, e.g. an open file:
+
+        with open("commands.jsonl") as f:
+            for line in iter_simulate_coding_framework(iter_jsonl_commands(f)):
+                ...
+    """
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch
-from simulation import simulate_coding_framework
+from datetime import datetime, timezone
+import simulation
+from simulation import simulate_coding_framework, iter_simulate_coding_framework, iter_jsonl_commands, parse_ts
 
 class TestSimulateCodingFramework(unittest.TestCase):
 
@@ -53,5 +55,188 @@ class TestSimulateCodingFramework(unittest.TestCase):
         output = simulate_coding_framework(self.test_data_4)
         self.assertEqual(output, ["uploaded at Initial.txt", "uploaded at Update1.txt", "got at Initial.txt", "copied at Update1.txt to Update1Copy.txt", "uploaded at Update2.txt", "rollback to 2021-07-01T12:10:00", "got at Update1.txt", "got at Initial.txt", "found at [Update1.txt, Update1Copy.txt, Update2.txt]", "got at Update2.txt"])
 
+    def test_register_command(self):
+        @simulation.register_command("FILE_EXISTS")
+        def file_exists(core, op):
+            return "yes" if core.get(at_ts=0, name=op[1]) else "no"
+        self.addCleanup(simulation._extra_commands.pop, "FILE_EXISTS")
+
+        output = simulate_coding_framework([["FILE_UPLOAD", "a.txt", "1kb"], ["FILE_EXISTS", "a.txt"], ["FILE_EXISTS", "b.txt"]])
+        self.assertEqual(output, ["uploaded a.txt", "yes", "no"])
+        self.assertRaises(RuntimeError, simulate_coding_framework, [["FILE_MISSING"]])
+
+    def test_streaming_jsonl(self):
+        lines = iter(['["FILE_UPLOAD", "Cars.txt", "200kb"]\n', '\n', '["FILE_GET", "Cars.txt"]\n'])
+        results = iter_simulate_coding_framework(iter_jsonl_commands(lines))
+        self.assertEqual(next(results), "uploaded Cars.txt")
+        self.assertEqual(next(lines), '\n')  # input is consumed lazily
+        self.assertEqual(list(results), ["got Cars.txt"])
+
+    def test_search_prefix_boundaries(self):
+        ops = [["FILE_UPLOAD", name, "1kb"] for name in ["b", "a", "ab", "abc", "ac", "aa", "A"]]
+        ops.append(["FILE_SEARCH", "ab"])
+        ops.append(["FILE_SEARCH", ""])
+        output = simulate_coding_framework(ops)
+        self.assertEqual(output[-2], "found [ab, abc]")
+        self.assertEqual(output[-1], "found [A, a, aa, ab, abc, ac, b]")
+
+    def test_search_top_10_by_size(self):
+        ops = [["FILE_UPLOAD", f"log{i:02d}.txt", f"{i % 4}kb"] for i in range(15)]
+        ops.append(["FILE_COPY", "log00.txt", "log03.txt"])  # log03 shrinks to 0kb
+        ops.append(["FILE_SEARCH", "l"])
+        ops.append(["FILE_SEARCH", "log0"])
+        output = simulate_coding_framework(ops)
+        self.assertEqual(output[-2], "found [log07.txt, log11.txt, log02.txt, log06.txt, log10.txt, log14.txt, "
+                                     "log01.txt, log05.txt, log09.txt, log13.txt]")
+        self.assertEqual(output[-1], "found [log07.txt, log02.txt, log06.txt, log01.txt, log05.txt, log09.txt, "
+                                     "log00.txt, log03.txt, log04.txt, log08.txt]")
+
+    def test_search_at_earlier_time_sees_expired_files(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb", 60],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "b.txt", "2kb", 120],
+            ["FILE_SEARCH_AT", "2021-07-01T12:01:30", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:00:30", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:05:00", ""],
+            ["ROLLBACK", "2021-07-01T12:04:30"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:05:00", ""],
+        ])
+        self.assertEqual(output[2:5], ["found at [b.txt]", "found at [b.txt, a.txt]", "found at []"])
+        self.assertEqual(output[-1], "found at [a.txt, b.txt]")
+
+    def test_search_alternating_with_and_without_time(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb", 60],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "b.txt", "2kb", 120],
+            ["FILE_UPLOAD", "c.txt", "3kb"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:01:30", ""],
+            ["FILE_SEARCH", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:00:30", "a"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:03:00", ""],
+            ["FILE_SEARCH", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:01:30", ""],
+        ])
+        self.assertEqual(output[3:], ["found at [c.txt, b.txt]", "found [c.txt, b.txt, a.txt]", "found at [a.txt]",
+                                      "found at [c.txt]", "found [c.txt, b.txt, a.txt]", "found at [c.txt, b.txt]"])
+
+    def test_multiple_rollbacks_with_writes_between(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb", 600],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "b.txt", "2kb", 1200],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "c.txt", "3kb"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:15:00", ""],
+            ["ROLLBACK", "2021-07-01T12:10:00"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:15:00", ""],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:12:00", "d.txt", "4kb", 300],
+            ["FILE_COPY_AT", "2021-07-01T12:12:00", "a.txt", "e.txt"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:18:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:25:00", ""],
+            ["ROLLBACK", "2021-07-01T12:20:00"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:25:00", ""],
+            ["FILE_GET_AT", "2021-07-01T12:29:00", "d.txt"],
+            ["FILE_GET_AT", "2021-07-01T12:29:00", "e.txt"],
+            ["FILE_COPY_AT", "2021-07-01T12:21:00", "d.txt", "f.txt"],
+            ["ROLLBACK", "2021-07-01T12:30:00"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:35:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:45:00", ""],
+            ["FILE_SEARCH", ""],
+        ])
+        self.assertEqual(output[3:], [
+            "found at [c.txt, b.txt]", "rollback to 2021-07-01T12:10:00", "found at [a.txt, b.txt, c.txt]",
+            "uploaded at d.txt", "copied at a.txt to e.txt", "found at [a.txt, b.txt, c.txt, e.txt]",
+            "found at [b.txt, c.txt]", "rollback to 2021-07-01T12:20:00", "found at [a.txt, b.txt, c.txt, e.txt]",
+            "file not found", "got at e.txt", "copied at d.txt to f.txt", "rollback to 2021-07-01T12:30:00",
+            "found at [a.txt, b.txt, c.txt, e.txt]", "found at [b.txt, c.txt]",
+            "found [d.txt, f.txt, c.txt, b.txt, a.txt, e.txt]"])
+
+    def test_rollbacks_then_search_earlier(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb", 600],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:30:00", "g.txt", "5kb", 600],
+            ["FILE_SEARCH_AT", "2021-07-01T12:45:00", ""],
+            ["ROLLBACK", "2021-07-01T12:40:00"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:45:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:55:00", ""],
+            ["ROLLBACK", "2021-07-01T12:50:00"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:55:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:52:00", "g"],
+            ["FILE_SEARCH_AT", "2021-07-01T13:05:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:59:00", ""],
+        ])
+        self.assertEqual(output[2:], ["found at []", "rollback to 2021-07-01T12:40:00", "found at [a.txt, g.txt]",
+                                      "found at []", "rollback to 2021-07-01T12:50:00", "found at [a.txt, g.txt]",
+                                      "found at [g.txt]", "found at []", "found at [a.txt, g.txt]"])
+
+    def test_copy_onto_itself_then_revive(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "b", "1kb", 60],
+            ["FILE_COPY_AT", "2021-07-01T12:00:00", "b", "b"],
+            ["FILE_SEARCH_AT", "2021-07-01T13:00:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T12:00:00", ""],
+        ])
+        self.assertEqual(output[-2:], ["found at []", "found at [b]"])
+
+    def test_copy_puts_back_earlier_file_then_revive(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a", "1kb", 60],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "b", "2kb", 60],
+            ["FILE_COPY_AT", "2021-07-01T12:00:00", "a", "c"],
+            ["FILE_COPY_AT", "2021-07-01T12:00:00", "b", "c"],
+            ["FILE_COPY_AT", "2021-07-01T12:00:00", "a", "c"],
+            ["FILE_SEARCH_AT", "2021-07-01T13:00:00", ""],
+            ["ROLLBACK", "2021-07-01T12:59:30"],
+            ["FILE_SEARCH_AT", "2021-07-01T13:00:00", ""],
+            ["FILE_SEARCH_AT", "2021-07-01T13:00:40", ""],
+            ["ROLLBACK", "2021-07-01T12:59:50"],
+            ["FILE_SEARCH_AT", "2021-07-01T13:00:40", ""],
+        ])
+        self.assertEqual(output[5:], ["found at []", "rollback to 2021-07-01T12:59:30", "found at [a, b, c]",
+                                      "found at []", "rollback to 2021-07-01T12:59:50", "found at [a, b, c]"])
+
+    def test_versions_and_restore(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb"],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "b.txt", "5kb", 60],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:10:00", "b.txt", "2kb"],
+            ["FILE_COPY_AT", "2021-07-01T12:20:00", "a.txt", "c.txt"],
+            ["FILE_GET_VERSION_AT", "2021-07-01T12:15:00", "c.txt"],
+            ["FILE_GET_VERSION_AT", "2021-07-01T12:00:30", "b.txt"],
+            ["FILE_GET_VERSION_AT", "2021-07-01T12:05:00", "b.txt"],
+            ["RESTORE", "2021-07-01T12:00:30"],
+            ["FILE_GET_AT", "2021-07-01T12:30:00", "c.txt"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:00:30", ""],
+            ["RESTORE", "2021-07-01T12:30:00"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:30:00", ""],
+        ])
+        self.assertEqual(output[4:], ["file not found", "got version at b.txt", "file not found",
+                                      "restored to 2021-07-01T12:00:30", "file not found",
+                                      "found at [b.txt, a.txt]", "restored to 2021-07-01T12:30:00",
+                                      "found at [a.txt]"])
+
+    def test_restore_discards_later_versions(self):
+        output = simulate_coding_framework([
+            ["FILE_UPLOAD_AT", "2021-07-01T12:00:00", "a.txt", "1kb"],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:10:00", "b.txt", "2kb"],
+            ["FILE_COPY_AT", "2021-07-01T12:12:00", "a.txt", "c.txt"],
+            ["RESTORE", "2021-07-01T12:05:00"],
+            ["FILE_GET_AT", "2021-07-01T12:20:00", "b.txt"],
+            ["FILE_GET_VERSION_AT", "2021-07-01T12:20:00", "b.txt"],
+            ["RESTORE", "2021-07-01T12:15:00"],
+            ["FILE_GET_AT", "2021-07-01T12:20:00", "b.txt"],
+            ["FILE_GET_VERSION_AT", "2021-07-01T12:20:00", "c.txt"],
+            ["FILE_UPLOAD_AT", "2021-07-01T12:30:00", "b.txt", "3kb"],
+            ["FILE_SEARCH_AT", "2021-07-01T12:30:00", ""],
+        ])
+        self.assertEqual(output[3:], ["restored to 2021-07-01T12:05:00", "file not found", "file not found",
+                                      "restored to 2021-07-01T12:15:00", "file not found", "file not found",
+                                      "uploaded at b.txt", "found at [b.txt, a.txt]"])
+
+    def test_parse_ts_matches_strptime(self):
+        for ts in ["2021-07-01T12:00:00", "1970-01-01T00:00:00", "2024-02-29T23:59:59", "2021-7-1T12:00:00"]:
+            expected = int(datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+            self.assertEqual(parse_ts(ts), expected)
+        for ts in ["2021-02-30T12:00:00", "2021-07-01T24:00:00", "2021-07-01 12:00:00", "2021-07-01T12:00:0x"]:
+            self.assertRaises(ValueError, parse_ts, ts)
+
 if __name__ == '__main__':
     unittest.main()
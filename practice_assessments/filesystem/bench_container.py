@@ -0,0 +1,138 @@
+"""
+Benchmarks for container.py.
+
+Run with `python3 bench_container.py` from this directory.
+"""
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from container import ApproximateContainer, CompactContainer, ConcurrentContainer, Container
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_bulk(n: int = 1_000_000) -> None:
+    values = np.random.default_rng(0).integers(-10**9, 10**9, size=n)
+    as_list = values.tolist()
+
+    def per_call():
+        c = Container()
+        for value in as_list:
+            c.add(value)
+
+    loop = _timed(per_call)
+    bulk = _timed(lambda: Container().add_many(values))
+    print(f"Container: {n} values")
+    print(f"  add loop  {loop:7.2f} s")
+    print(f"  add_many  {bulk:7.2f} s  ({loop / bulk:.1f}x)")
+
+
+def _build(cls, values, *args):
+    # Returns the container and the memory it holds once built.
+    tracemalloc.start()
+    c = cls(*args)
+    for value in values:
+        c.add(value)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return c, size
+
+
+def bench_approximate(n: int = 200_000, relative_accuracy: float = 0.01) -> None:
+    # Latency-like stream: log-normal, heavy right tail.
+    values = np.random.default_rng(0).lognormal(8, 1.5, size=n).astype(np.int64).tolist()
+
+    exact, exact_bytes = _build(Container, values)
+    approx, approx_bytes = _build(ApproximateContainer, values, relative_accuracy)
+    print(f"ApproximateContainer({relative_accuracy}) vs Container: {n} values")
+    print(f"  memory  exact {exact_bytes / 2**20:8.1f} MiB   approximate {approx_bytes / 2**10:8.1f} KiB")
+    for q in (0.5, 0.9, 0.99):
+        want, got = exact.get_quantile(q), approx.get_quantile(q)
+        print(f"  p{round(q * 100):<3}    exact {want:10d}   approximate {got:10d}   error {abs(got - want) / want:.4%}")
+
+
+def bench_memory(n: int = 1_000_000) -> None:
+    values = np.random.default_rng(0).integers(-10**9, 10**9, size=n)
+    print(f"memory held by {n} values")
+    for cls in (Container, CompactContainer):
+        # The ints are created under tracemalloc, so a container that
+        # keeps them boxed is charged for them.
+        tracemalloc.start()
+        c = cls()
+        c.add_many(values)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {cls.__name__:17} {size / 2**20:8.1f} MiB  {size / n:6.1f} bytes/value")
+        del c
+
+
+class _LockedContainer:
+    # Baseline: one lock around every call.
+    def __init__(self):
+        self._container = Container()
+        self._lock = threading.Lock()
+
+    def add(self, value: int) -> None:
+        with self._lock:
+            self._container.add(value)
+
+    def get_median(self) -> int:
+        with self._lock:
+            return self._container.get_median()
+
+
+def _run_threads(container, writers: int, per_writer: int, readers: int) -> tuple[float, int]:
+    # Returns the writers' wall time and the number of reads done meanwhile.
+    stop = threading.Event()
+    values = np.random.default_rng(0).integers(0, 10**6, size=per_writer).tolist()
+    reads = [0] * readers
+
+    def write():
+        for value in values:
+            container.add(value)
+
+    def read(slot):
+        while not stop.is_set():
+            try:
+                container.get_median()
+            except RuntimeError:
+                pass
+            reads[slot] += 1
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    reader_threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    for t in reader_threads:
+        t.start()
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in reader_threads:
+        t.join()
+    return elapsed, sum(reads)
+
+
+def bench_concurrent(writers: int = 8, per_writer: int = 100_000) -> None:
+    n = writers * per_writer
+    print(f"{writers} writer threads x {per_writer} adds")
+    for readers in (0, 2):
+        for name, container in (("lock per call", _LockedContainer()), ("ConcurrentContainer", ConcurrentContainer())):
+            elapsed, reads = _run_threads(container, writers, per_writer, readers)
+            print(f"  {readers} readers, {name:20} {n / elapsed / 1e3:6.0f} k adds/s  {reads / elapsed / 1e3:7.0f} k reads/s")
+
+
+if __name__ == "__main__":
+    bench_bulk()
+    bench_approximate()
+    bench_memory()
+    bench_concurrent()
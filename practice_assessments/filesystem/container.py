@@ -1,7 +1,26 @@
 from __future__ import annotations
 
 import heapq
-from collections import Counter, defaultdict
+import math
+import operator
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+from sortedcontainers import SortedList
+
+# add_many / delete_many rebuild both heaps once the batch is at least
+# 1 / _BULK_REBUILD_RATIO of the container; smaller batches go one by one.
+_BULK_REBUILD_RATIO = 8
+
+# A heap is compacted once more than half of its entries are deleted
+# values still waiting to surface, provided it has more than this many.
+_COMPACT_MIN_SIZE = 64
 
 
 class Container:
@@ -24,6 +43,11 @@ class Container:
         self._n_low = 0
         self._n_high = 0
 
+        # Order-statistic index of the live values for get_kth /
+        # get_quantile, built on their first call so that callers who only
+        # need the median never pay for it.
+        self._sorted: SortedList | None = None
+
     def add(self, value: int) -> None:
         """
         Adds the specified value to the container
@@ -32,6 +56,8 @@ class Container:
         """
         # TODO: implement this method
         self._count[value] += 1
+        if self._sorted is not None:
+            self._sorted.add(value)
 
         if self._n_low == 0:
             heapq.heappush(self._low, -value)
@@ -66,6 +92,8 @@ class Container:
         self._count[value] -= 1
         if self._count[value] == 0:
             del self._count[value]
+        if self._sorted is not None:
+            self._sorted.remove(value)
 
         self._prune_low()
         self._prune_high()
@@ -86,8 +114,66 @@ class Container:
         self._prune_low()
         self._prune_high()
         self._rebalance()
+        self._maybe_compact()
         return True
 
+    def add_many(self, values) -> None:
+        """
+        Adds every value of an iterable or a NumPy array.
+
+        A large batch is merged by sorting all values once and rebuilding
+        both heaps, O((n + m) log(n + m)) instead of m separate pushes
+        and rebalances.
+
+        :param values: iterable of int
+        """
+        values = _as_list(values)
+        if len(values) * _BULK_REBUILD_RATIO < self._n_low + self._n_high:
+            for value in values:
+                self.add(value)
+            return
+
+        self._count.update(values)
+        self._rebuild()
+
+    def delete_many(self, values) -> int:
+        """
+        Attempts to delete one item per entry of an iterable or a NumPy
+        array, rebuilding the heaps once for a large batch.
+
+        :param values: iterable of int
+        :return: the number of values that were deleted
+        """
+        values = _as_list(values)
+        if len(values) * _BULK_REBUILD_RATIO < self._n_low + self._n_high:
+            return sum(self.delete(value) for value in values)
+
+        deleted = 0
+        for value in values:
+            if self._count[value] > 0:
+                self._count[value] -= 1
+                if self._count[value] == 0:
+                    del self._count[value]
+                deleted += 1
+        if deleted:
+            self._rebuild()
+        return deleted
+
+    @property
+    def live_size(self) -> int:
+        """
+        :return: the number of integers in the container
+        """
+        return self._n_low + self._n_high
+
+    @property
+    def heap_size(self) -> int:
+        """
+        :return: the number of heap entries, including deleted values
+                 that have not been pruned yet
+        """
+        return len(self._low) + len(self._high)
+
     def get_median(self) -> int:
         """
         Finds the container's median integer value, which is
@@ -109,6 +195,44 @@ class Container:
         self._prune_low()
         return -self._low[0]
 
+    def get_kth(self, k: int) -> int:
+        """
+        Finds the k-th smallest integer (0-based) in O(log n). The first
+        call builds the order-statistic index in O(n log n); from then on
+        add and delete keep it up to date.
+
+        :param k: int
+        :return: The k-th smallest integer if 0 <= k < size, or
+        :raise:  a runtime exception, otherwise.
+        """
+        ordered = self._order_index()
+        if not 0 <= k < len(ordered):
+            raise RuntimeError(f"k out of range: {k}")
+        return ordered[k]
+
+    def get_quantile(self, q: float) -> int:
+        """
+        Finds the integer at quantile q, i.e. at 0-based index
+        floor(q * (size - 1)) of the sorted integers, in O(log n) once
+        the index get_kth describes is built.
+        q = 0.5 gives the same integer as get_median.
+
+        :param q: float between 0 and 1
+        :return: The quantile if the array is not empty, or
+        :raise:  a runtime exception, otherwise.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be within [0, 1]: {q}")
+        ordered = self._order_index()
+        if not ordered:
+            raise RuntimeError("Container is empty")
+        return ordered[_quantile_index(q, len(ordered))]
+
+    def _order_index(self) -> SortedList:
+        if self._sorted is None:
+            self._sorted = SortedList(self._count.elements())
+        return self._sorted
+
     def _prune_low(self) -> None:
         while self._low:
             v = -self._low[0]
@@ -131,6 +255,28 @@ class Container:
             else:
                 break
 
+    def _maybe_compact(self) -> None:
+        # Entries in a heap beyond its live count are pending deletions.
+        if len(self._low) > _COMPACT_MIN_SIZE and (len(self._low) - self._n_low) * 2 > len(self._low):
+            self._low = self._compacted(self._low, self._del_low, -1)
+        if len(self._high) > _COMPACT_MIN_SIZE and (len(self._high) - self._n_high) * 2 > len(self._high):
+            self._high = self._compacted(self._high, self._del_high, 1)
+
+    @staticmethod
+    def _compacted(heap: list, deleted: defaultdict, sign: int) -> list:
+        # Drops every pending deletion from `heap` in one pass, O(len(heap)).
+        kept = []
+        for entry in heap:
+            v = sign * entry
+            if deleted.get(v, 0) > 0:
+                deleted[v] -= 1
+                if deleted[v] == 0:
+                    del deleted[v]
+            else:
+                kept.append(entry)
+        heapq.heapify(kept)
+        return kept
+
     def _rebalance(self) -> None:
         self._prune_low()
         self._prune_high()
@@ -166,3 +312,580 @@ class Container:
 
             self._prune_low()
             self._prune_high()
+
+    def _rebuild(self) -> None:
+        # Splits the sorted live values in half. A descending run negated
+        # and an ascending run are both valid min-heaps as they stand.
+        ordered = sorted(self._count.elements())
+        half = (len(ordered) + 1) // 2
+        if self._sorted is not None:
+            self._sorted = SortedList(ordered)
+
+        self._low = [-v for v in reversed(ordered[:half])]
+        self._high = ordered[half:]
+
+        self._del_low.clear()
+        self._del_high.clear()
+
+        self._count_low = Counter(ordered[:half])
+        self._count_high = Counter(ordered[half:])
+
+        self._n_low = half
+        self._n_high = len(ordered) - half
+
+
+class WindowedContainer(Container):
+    """
+    A Container that only holds the most recent values: the last
+    `window_size` added values, the values added within the last
+    `window_seconds` (timestamps come with add), or both.
+
+    Older values are evicted automatically through Container.delete, so
+    every step is amortised O(log n); heap compaction keeps the lazily
+    deleted entries from piling up.
+    """
+
+    def __init__(self, window_size: int | None = None, window_seconds: float | None = None):
+        super().__init__()
+        if window_size is None and window_seconds is None:
+            raise ValueError("Either window_size or window_seconds is required")
+        if window_size is not None and window_size < 1:
+            raise ValueError(f"window_size must be positive: {window_size}")
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+
+        # (timestamp, value) in insertion order
+        self._window = deque()
+        # Values deleted by the caller while still in the window; their
+        # eviction must not delete a second copy.
+        self._gone = Counter()
+        self._last_ts = None
+
+    def add(self, value: int, timestamp: float | None = None) -> None:
+        """
+        Adds the specified value and evicts the values that fall out of
+        the window
+
+        :param value: int
+        :param timestamp: required for a time window; must not decrease
+        """
+        if self.window_seconds is not None:
+            if timestamp is None:
+                raise ValueError("A timestamp is required for a time window")
+            self.advance_to(timestamp)
+
+        super().add(value)
+        self._window.append((timestamp, value))
+
+        if self.window_size is not None:
+            while len(self._window) > self.window_size:
+                self._evict()
+
+    def delete(self, value: int) -> bool:
+        """
+        Attempts to delete one item of the specified value from the window
+
+        :param value: int
+        :return: True, if the value has been deleted, or
+                 False, otherwise.
+        """
+        if not super().delete(value):
+            return False
+        self._gone[value] += 1
+        return True
+
+    def add_many(self, values, timestamp: float | None = None) -> None:
+        """
+        Adds every value of an iterable or a NumPy array in order,
+        all with the same timestamp
+
+        :param values: iterable of int
+        """
+        for value in _as_list(values):
+            self.add(value, timestamp)
+
+    def delete_many(self, values) -> int:
+        """
+        :param values: iterable of int
+        :return: the number of values that were deleted
+        """
+        return sum(self.delete(value) for value in _as_list(values))
+
+    def advance_to(self, timestamp: float) -> None:
+        """
+        Evicts the values added at or before `timestamp - window_seconds`
+
+        :param timestamp: must not be older than the last timestamp seen
+        """
+        if self.window_seconds is None:
+            raise ValueError("advance_to needs a time window (window_seconds)")
+        if self._last_ts is not None and timestamp < self._last_ts:
+            raise ValueError(f"Timestamps must not decrease: {timestamp} < {self._last_ts}")
+        self._last_ts = timestamp
+        cutoff = timestamp - self.window_seconds
+        while self._window and self._window[0][0] <= cutoff:
+            self._evict()
+
+    def _evict(self) -> None:
+        _, value = self._window.popleft()
+        if self._gone[value] > 0:
+            self._gone[value] -= 1
+            if self._gone[value] == 0:
+                del self._gone[value]
+        else:
+            super().delete(value)
+
+
+class ApproximateContainer:
+    """
+    A bounded-memory stand-in for Container, for streams too large to
+    keep every integer.
+
+    Values are counted in logarithmic buckets, as in DDSketch: bucket i
+    of each sign holds the magnitudes in (gamma^(i-1), gamma^i] with
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy). Any
+    reported value is within relative_accuracy of the exact answer
+    (plus rounding to an int), and the number of buckets only depends on
+    the range of the values: about ln(max) / (2 * relative_accuracy)
+    per sign, e.g. ~2000 for 1% accuracy over 64-bit magnitudes.
+
+    Unlike most sketches this one supports delete, by decrementing the
+    value's bucket.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be within (0, 1): {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+        self._pos = Counter()
+        self._neg = Counter()
+        self._zero = 0
+        self._n = 0
+
+    def add(self, value: int) -> None:
+        """
+        Adds the specified value to the container
+
+        :param value: int
+        """
+        if value > 0:
+            self._pos[self._bucket(value)] += 1
+        elif value < 0:
+            self._neg[self._bucket(-value)] += 1
+        else:
+            self._zero += 1
+        self._n += 1
+
+    def delete(self, value: int) -> bool:
+        """
+        Attempts to delete one item of the specified value from the container
+
+        :param value: int
+        :return: True, if an item in the value's bucket has been deleted, or
+                 False, otherwise.
+        """
+        if value == 0:
+            if self._zero == 0:
+                return False
+            self._zero -= 1
+        else:
+            buckets = self._pos if value > 0 else self._neg
+            i = self._bucket(abs(value))
+            if buckets[i] == 0:
+                return False
+            buckets[i] -= 1
+            if buckets[i] == 0:
+                del buckets[i]
+        self._n -= 1
+        return True
+
+    @property
+    def live_size(self) -> int:
+        """
+        :return: the number of integers in the container
+        """
+        return self._n
+
+    def get_median(self) -> int:
+        """
+        Estimates the container's median integer, using the same
+        leftmost-middle rule as Container.get_median.
+
+        :return: The estimated median if the array is not empty, or
+        :raise:  a runtime exception, otherwise.
+        """
+        if self._n == 0:
+            raise RuntimeError("Container is empty")
+        return self._value_at((self._n - 1) // 2)
+
+    def get_quantile(self, q: float) -> int:
+        """
+        Estimates the integer at quantile q, as Container.get_quantile.
+
+        :param q: float between 0 and 1
+        :return: The estimated quantile if the array is not empty, or
+        :raise:  a runtime exception, otherwise.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be within [0, 1]: {q}")
+        if self._n == 0:
+            raise RuntimeError("Container is empty")
+        return self._value_at(_quantile_index(q, self._n))
+
+    def _bucket(self, magnitude: int) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _estimate(self, i: int) -> float:
+        # The point of bucket i with the same relative error to both ends.
+        return 2 * self._gamma ** i / (self._gamma + 1)
+
+    def _value_at(self, rank: int) -> int:
+        # Walks the buckets in value order: most negative first.
+        for i in sorted(self._neg, reverse=True):
+            rank -= self._neg[i]
+            if rank < 0:
+                return -round(self._estimate(i))
+        rank -= self._zero
+        if rank < 0:
+            return 0
+        for i in sorted(self._pos):
+            rank -= self._pos[i]
+            if rank < 0:
+                return round(self._estimate(i))
+        raise AssertionError("bucket counts do not add up to the size")
+
+
+class CompactContainer:
+    """
+    A Container for very large populations, storing each integer as 8
+    bytes instead of boxed Python ints in heaps and counters.
+
+    Values are kept sorted in array('q') chunks of _LOAD to 2 * _LOAD
+    items, found by bisecting the chunk maxima, with a Fenwick tree over
+    the chunk lengths for positional lookups:
+
+    - add / delete:                     O(log n) plus an O(_LOAD) memmove
+    - get_median / get_kth / quantile:  O(log n)
+
+    Values must fit in a signed 64-bit integer.
+    """
+
+    __slots__ = ("_chunks", "_maxes", "_tree", "_n")
+
+    _LOAD = 2048
+
+    def __init__(self):
+        self._chunks: list[array] = []
+        self._maxes: list[int] = []
+        self._tree: list[int] = [0]
+        self._n = 0
+
+    def add(self, value: int) -> None:
+        """
+        Adds the specified value to the container
+
+        :param value: int
+        """
+        # The array insert is what rejects a value outside 64 bits, so it
+        # runs before any other state changes.
+        if not self._chunks:
+            self._chunks.append(array("q", [value]))
+            self._maxes.append(value)
+            self._n += 1
+            self._reindex()
+            return
+
+        i = min(bisect_left(self._maxes, value), len(self._maxes) - 1)
+        chunk = self._chunks[i]
+        chunk.insert(bisect_right(chunk, value), value)
+        self._n += 1
+        if value > self._maxes[i]:
+            self._maxes[i] = value
+
+        if len(chunk) > 2 * self._LOAD:
+            tail = chunk[self._LOAD:]
+            del chunk[self._LOAD:]
+            self._chunks.insert(i + 1, tail)
+            self._maxes.insert(i + 1, tail[-1])
+            self._maxes[i] = chunk[-1]
+            self._reindex()
+        else:
+            self._tree_add(i, 1)
+
+    def delete(self, value: int) -> bool:
+        """
+        Attempts to delete one item of the specified value from the container
+
+        :param value: int
+        :return: True, if the value has been deleted, or
+                 False, otherwise.
+        """
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            return False
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, value)
+        if chunk[j] != value:
+            return False
+
+        del chunk[j]
+        self._n -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+            self._reindex()
+        return True
+
+    def add_many(self, values) -> None:
+        """
+        Adds every value of an iterable or a NumPy array. A large batch is
+        merged with the stored values by one NumPy sort. The batch is
+        checked first, so a value add() would reject leaves the container
+        unchanged.
+
+        :param values: iterable of int
+        :raise:  TypeError for a non-integer value, OverflowError for one
+                 outside 64 bits.
+        """
+        values = _as_int64(values)
+        if len(values) * _BULK_REBUILD_RATIO < self._n:
+            for value in values.tolist():
+                self.add(value)
+            return
+
+        merged = np.sort(np.concatenate([np.frombuffer(chunk, dtype=np.int64) for chunk in self._chunks] + [values]))
+        self._chunks = [array("q", merged[i:i + self._LOAD].tobytes()) for i in range(0, len(merged), self._LOAD)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._n = len(merged)
+        self._reindex()
+
+    def delete_many(self, values) -> int:
+        """
+        :param values: iterable of int
+        :return: the number of values that were deleted
+        """
+        return sum(self.delete(value) for value in _as_list(values))
+
+    @property
+    def live_size(self) -> int:
+        """
+        :return: the number of integers in the container
+        """
+        return self._n
+
+    def get_median(self) -> int:
+        """
+        Finds the container's median integer, using the same
+        leftmost-middle rule as Container.get_median.
+
+        :return: The median if the array is not empty, or
+        :raise:  a runtime exception, otherwise.
+        """
+        if self._n == 0:
+            raise RuntimeError("Container is empty")
+        return self.get_kth((self._n - 1) // 2)
+
+    def get_kth(self, k: int) -> int:
+        """
+        Finds the k-th smallest integer (0-based).
+
+        :param k: int
+        :return: The k-th smallest integer if 0 <= k < size, or
+        :raise:  a runtime exception, otherwise.
+        """
+        if not 0 <= k < self._n:
+            raise RuntimeError(f"k out of range: {k}")
+        # Fenwick descent to the chunk holding rank k.
+        tree = self._tree
+        pos = 0
+        step = 1 << ((len(tree) - 1).bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return self._chunks[pos][k]
+
+    def get_quantile(self, q: float) -> int:
+        """
+        Finds the integer at quantile q, as Container.get_quantile.
+
+        :param q: float between 0 and 1
+        :return: The quantile if the array is not empty, or
+        :raise:  a runtime exception, otherwise.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be within [0, 1]: {q}")
+        if self._n == 0:
+            raise RuntimeError("Container is empty")
+        return self.get_kth(_quantile_index(q, self._n))
+
+    def _tree_add(self, i: int, delta: int) -> None:
+        tree = self._tree
+        i += 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _reindex(self) -> None:
+        # Rebuilds the Fenwick tree in O(chunks), after chunks split or go away.
+        tree = [0] + [len(chunk) for chunk in self._chunks]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+
+class ConcurrentContainer:
+    """
+    Lets many threads share one container (a Container by default).
+
+    Each writer thread appends its values to its own buffer, which is
+    flushed into the container with a single add_many under the lock
+    once it holds `batch_size` values. Every flush publishes the new
+    median, so get_median is usually a plain attribute read that never
+    waits for a writer. When no flush of every buffer has happened for
+    `max_delay` seconds, or nothing has been published yet, and some
+    buffer holds values, get_median flushes them all first: it never
+    misses a value added more than `max_delay` seconds earlier. Call
+    flush() first for an exact answer.
+
+    delete flushes all buffers before deleting, so it always sees every
+    value added so far. Buffers of threads that have exited are dropped
+    once flushed.
+    """
+
+    def __init__(self, container=None, batch_size: int = 1024, max_delay: float = 0.01):
+        self._container = container if container is not None else Container()
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._buffers: list[tuple[threading.Thread, list[int]]] = []
+        self._flushed_at = time.monotonic()
+        self._median = None
+
+    def add(self, value: int) -> None:
+        """
+        Adds the specified value to the calling thread's buffer
+
+        :param value: int
+        """
+        buffer = self._buffer()
+        buffer.append(value)
+        if len(buffer) >= self._batch_size:
+            with self._lock:
+                self._flush(buffer)
+                self._publish()
+
+    def delete(self, value: int) -> bool:
+        """
+        Attempts to delete one item of the specified value from the container
+
+        :param value: int
+        :return: True, if the value has been deleted, or
+                 False, otherwise.
+        """
+        with self._lock:
+            self._flush_all()
+            deleted = self._container.delete(value)
+            self._publish()
+        return deleted
+
+    def flush(self) -> None:
+        """
+        Moves the values buffered by every thread into the container
+        """
+        with self._lock:
+            self._flush_all()
+            self._publish()
+
+    def get_median(self) -> int:
+        """
+        Returns the median as of the last flush, without locking unless
+        the buffered values are due to be flushed (see the class doc).
+
+        :return: The median if the container is not empty, or
+        :raise:  a runtime exception, otherwise.
+        """
+        median = self._median
+        if ((median is None or time.monotonic() - self._flushed_at > self._max_delay)
+                and any(buffer for _, buffer in self._buffers)):
+            self.flush()
+            median = self._median
+        if median is None:
+            raise RuntimeError("Container is empty")
+        return median
+
+    def _buffer(self) -> list[int]:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = []
+            with self._lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        return buffer
+
+    def _flush_all(self) -> None:
+        # Runs under the lock. A thread found dead before its buffer is
+        # flushed has made its last append, so that buffer can go.
+        alive = [thread.is_alive() for thread, _ in self._buffers]
+        for _, buffer in self._buffers:
+            self._flush(buffer)
+        self._buffers = [entry for entry, keep in zip(self._buffers, alive) if keep]
+        self._flushed_at = time.monotonic()
+
+    def _flush(self, buffer: list[int]) -> None:
+        # Runs under the lock. The owner thread may append meanwhile; it
+        # only appends, so deleting the first len(values) items is safe.
+        values = buffer[:]
+        del buffer[:len(values)]
+        if values:
+            self._container.add_many(values)
+
+    def _publish(self) -> None:
+        try:
+            self._median = self._container.get_median()
+        except RuntimeError:
+            self._median = None
+
+
+def _as_list(values) -> list:
+    # NumPy arrays convert to plain Python ints in one call.
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+def _as_int64(values) -> np.ndarray:
+    # Like np.asarray(..., dtype=np.int64), but refusing what that would
+    # silently truncate (1.7 -> 1) or wrap (2 ** 64 - 1 -> -1).
+    values = np.asarray(values if hasattr(values, "tolist") else list(values))
+    if values.dtype == object:
+        # Python ints too large for any NumPy integer, or non-numbers.
+        return np.array([operator.index(value) for value in values.tolist()], dtype=np.int64)
+    if values.size and not np.can_cast(values.dtype, np.int64):
+        if values.dtype.kind != "u":
+            raise TypeError(f"Expected integers, got {values.dtype} values")
+        if values.max() > np.iinfo(np.int64).max:
+            raise OverflowError("Value does not fit in a signed 64-bit integer")
+    return values.astype(np.int64)
+
+
+@lru_cache(maxsize=64)
+def _quantile_ratio(q: float) -> tuple[int, int]:
+    # q as written, e.g. 29/100 for 0.29, not the binary float just below it.
+    return Fraction(str(q)).as_integer_ratio()
+
+
+def _quantile_index(q: float, n: int) -> int:
+    # Exact floor(q * (n - 1)); float products are off by one for large n.
+    num, den = _quantile_ratio(q)
+    return num * (n - 1) // den
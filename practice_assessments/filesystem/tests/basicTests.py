@@ -1,13 +1,15 @@
-import inspect, os, sys
+import inspect, os, sys, threading, time
 current_dir = os.path.dirname(os.path.abspath(
     inspect.getfile(inspect.currentframe())
 ))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
+import numpy as np
 from timeout_decorator import timeout
 import unittest
-from container import Container
+from container import ApproximateContainer, CompactContainer, ConcurrentContainer, Container, WindowedContainer
+from container import _quantile_index
 
 
 class DemoICATest(unittest.TestCase):
@@ -103,3 +105,188 @@ class DemoICATest(unittest.TestCase):
         for i in range(4, 7):
             self.assertEqual(self.container.delete(i), True)
         self.assertEqual(self.container.get_median(), 7)
+
+    """
+    Add 3, then 10, 1, 4, 1 in one batch -> [1, 1, 3, 4, 10]
+    Median of [1, 1, 3, 4, 10] is 3
+    Delete 1, 3, 8 in one batch -> [1, 4, 10]
+    Median of [1, 4, 10] is 4
+    """
+    @timeout(0.1)
+    def test_bulk(self):
+        self.container.add(3)
+        self.container.add_many(np.array([10, 1, 4, 1]))
+        self.assertEqual(self.container.get_median(), 3)
+        self.assertEqual(self.container.delete_many([1, 3, 8]), 2)
+        self.assertEqual(self.container.get_median(), 4)
+
+    """
+    Add 0..999, then repeatedly delete the smallest value and add a larger one
+    Heaps are compacted, so they never hold more than twice the live values
+    """
+    @timeout(0.5)
+    def test_churn_compaction(self):
+        self.container.add_many(range(1000))
+        for i in range(5000):
+            self.assertEqual(self.container.delete(i), True)
+            self.container.add(i + 1000)
+            self.assertLessEqual(self.container.heap_size, 2 * self.container.live_size + 1)
+        self.assertEqual(self.container.live_size, 1000)
+        self.assertEqual(self.container.get_median(), 5499)
+
+    """
+    Add 1..100 -> p0 = 1, p50 = 50, p90 = 90, p99 = 99, p100 = 100
+    The 0-based 9th smallest value is 10
+    """
+    @timeout(0.1)
+    def test_quantiles(self):
+        self.container.add_many(range(100, 0, -1))
+        self.assertEqual(self.container.get_quantile(0), 1)
+        self.assertEqual(self.container.get_quantile(0.5), self.container.get_median())
+        self.assertEqual(self.container.get_quantile(0.9), 90)
+        self.assertEqual(self.container.get_quantile(0.99), 99)
+        self.assertEqual(self.container.get_quantile(1), 100)
+        self.assertEqual(self.container.get_kth(9), 10)
+        self.assertRaises(Exception, self.container.get_kth, 100)
+        self.assertRaises(ValueError, self.container.get_quantile, 1.5)
+        # The index built by the first call follows later updates.
+        self.assertEqual(self.container.delete(1), True)
+        self.container.add(0)
+        self.assertEqual(self.container.get_kth(0), 0)
+        self.assertEqual(self.container.get_kth(1), 2)
+
+    """
+    With 100_000_001 values, q = 0.29, 0.57 and 0.58 sit exactly on
+    indices 29_000_000, 57_000_000 and 58_000_000
+    """
+    @timeout(0.1)
+    def test_quantile_index_large(self):
+        n = 100_000_001
+        for percent in range(101):
+            self.assertEqual(_quantile_index(percent / 100, n), percent * 1_000_000)
+        self.assertEqual(_quantile_index(0.2999999999999999, n), 29_999_999)
+
+    """
+    Add 1..1000 and -5 to an approximate container with 1% accuracy
+    Median of [-5, 1, ..., 1000] is 500, reported within 1%
+    Delete -5 and 1000 -> median of [1, ..., 999] is 500
+    """
+    @timeout(0.1)
+    def test_approximate(self):
+        container = ApproximateContainer(relative_accuracy=0.01)
+        self.assertRaises(Exception, container.get_median)
+        container.add(-5)
+        for i in range(1, 1001):
+            container.add(i)
+        self.assertLessEqual(abs(container.get_median() - 500), 5)
+        self.assertEqual(container.delete(-5), True)
+        self.assertEqual(container.delete(-6), False)
+        self.assertEqual(container.delete(1000), True)
+        self.assertLessEqual(abs(container.get_median() - 500), 5)
+        self.assertEqual(container.get_quantile(0), 1)
+
+    """
+    Window of 3: add 5, 1, 9, 3 -> window [1, 9, 3], median 3
+    Delete 9, add 4 -> window [3, 4], median 3
+    Time window of 10s: values at t=0, 3, 9, 13 -> window (3, 13] holds 7, 2
+    """
+    @timeout(0.1)
+    def test_windowed(self):
+        container = WindowedContainer(window_size=3)
+        for value in [5, 1, 9, 3]:
+            container.add(value)
+        self.assertEqual(container.get_median(), 3)
+        self.assertEqual(container.delete(5), False)
+        self.assertEqual(container.delete(9), True)
+        container.add(4)
+        self.assertEqual(container.get_median(), 3)
+        self.assertEqual(container.live_size, 2)
+        self.assertRaises(ValueError, container.advance_to, 10)
+
+        container = WindowedContainer(window_seconds=10)
+        for ts, value in [(0, 5), (3, 1), (9, 7), (13, 2)]:
+            container.add(value, timestamp=ts)
+        self.assertEqual(container.get_median(), 2)
+        container.advance_to(19)
+        self.assertEqual(container.get_median(), 2)
+        self.assertRaises(ValueError, container.advance_to, 18)
+
+    """
+    Same steps as test_basic3 on the compact container,
+    then a bulk load of 10000 values on top
+    """
+    @timeout(0.5)
+    def test_compact(self):
+        container = CompactContainer()
+        self.assertEqual(container.delete(4), False)
+        self.assertRaises(Exception, container.get_median)
+        self.assertRaises(OverflowError, container.add, 2 ** 70)
+        self.assertEqual(container.live_size, 0)
+        for i in range(10, 0, -1):
+            container.add(i)
+        self.assertEqual(container.get_median(), 5)
+        for i in range(4, 7):
+            self.assertEqual(container.delete(i), True)
+        self.assertEqual(container.get_median(), 7)
+        container.add_many(np.arange(100, 10100))
+        self.assertEqual(container.live_size, 10007)
+        self.assertEqual(container.get_median(), 5096)
+        self.assertEqual(container.get_kth(0), 1)
+        self.assertRaises(OverflowError, container.add, 2 ** 70)
+        self.assertEqual(container.live_size, 10007)
+        # Batches are checked before any value goes in.
+        self.assertRaises(TypeError, container.add_many, [3, 1.7])
+        self.assertRaises(TypeError, container.add_many, np.array([0.5] * 20000))
+        self.assertRaises(OverflowError, container.add_many, np.array([3, 2 ** 64 - 1], dtype=np.uint64))
+        self.assertRaises(OverflowError, container.add_many, [3, 2 ** 70])
+        self.assertEqual(container.live_size, 10007)
+        self.assertEqual(container.get_kth(10006), 10099)
+
+    @timeout(10)
+    def test_concurrent(self):
+        container = ConcurrentContainer(batch_size=16)
+        self.assertRaises(Exception, container.get_median)
+
+        def write(start):
+            for i in range(start, 1000, 4):
+                container.add(i)
+
+        threads = [threading.Thread(target=write, args=(start,)) for start in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        container.flush()
+        self.assertEqual(container.get_median(), 499)
+        self.assertEqual(container.delete(499), True)
+        self.assertEqual(container.delete(1000), False)
+        self.assertEqual(container.get_median(), 500)
+
+    """
+    With the default batch_size, 10 adds stay buffered; get_median
+    flushes them instead of reporting an empty container
+    Short-lived writer threads leave no buffer behind once flushed
+    """
+    @timeout(10)
+    def test_concurrent_idle_writers(self):
+        container = ConcurrentContainer()
+        for i in range(10):
+            container.add(i)
+        self.assertEqual(container.get_median(), 4)
+        container.add(10)
+        container.add(11)
+        time.sleep(0.02)
+        self.assertEqual(container.get_median(), 5)
+
+        def write(value):
+            container.add(value)
+
+        for value in range(12, 62):
+            thread = threading.Thread(target=write, args=(value,))
+            thread.start()
+            thread.join()
+        time.sleep(0.02)
+        self.assertEqual(container.get_median(), 30)
+        container.flush()
+        self.assertEqual(len(container._buffers), 1)
+
@@ -0,0 +1,36 @@
+"""
+Benchmarks for integer_container_impl.py.
+
+Run with `python3 bench_integer_container.py` from this directory.
+"""
+import time
+
+import numpy as np
+
+from integer_container_impl import IntegerContainerImpl
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_bulk(n: int = 1_000_000) -> None:
+    values = np.random.default_rng(0).integers(-10**9, 10**9, size=n)
+    as_list = values.tolist()
+
+    def per_call():
+        c = IntegerContainerImpl()
+        for value in as_list:
+            c.add(value)
+
+    loop = _timed(per_call)
+    bulk = _timed(lambda: IntegerContainerImpl().add_many(values))
+    print(f"IntegerContainerImpl: {n} values")
+    print(f"  add loop  {loop:7.2f} s")
+    print(f"  add_many  {bulk:7.2f} s  ({loop / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    bench_bulk()
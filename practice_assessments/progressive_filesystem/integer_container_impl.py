@@ -1,28 +1,52 @@
 # MAKE CHANGE ONLY IN THIS FILE
 from integer_container import IntegerContainer
 
-from collections import defaultdict
-from bisect import bisect_left, insort
+from collections import Counter
+from fractions import Fraction
+
+from sortedcontainers import SortedList
 
 
 class IntegerContainerImpl(IntegerContainer):
+    """
+    Every stored value, duplicates included, lives in a SortedList:
+
+    - add:        O(log n)
+    - delete:     O(log n), O(1) when the value is absent
+    - get_median: O(1)
+
+    SortedList splits its values into bounded sub-lists, so inserts and
+    removals never memmove more than one sub-list and throughput stays
+    flat as the number of distinct values grows.
+
+    The median itself is a cursor, (key, offset inside the run of equal
+    keys), that add and delete move by at most one position. Moving
+    within a run is O(1); only stepping to the neighbouring key needs a
+    bisect.
+    """
 
     def __init__(self):
         # TODO: implement
-        self._counts = defaultdict(int)
-        self._size = 0
-        self._keys: list[int] = []
+        self._counts = Counter()
+        self._values = SortedList()
+        self._median_key: int | None = None
+        self._median_offset = 0
 
     # TODO: implement interface methods here
     def add(self, value: int) -> int:
         # self._counts[value] += 1
         # self._size += 1
         # return self._size
-        if self._counts[value] == 0:
-            insort(self._keys, value)
         self._counts[value] += 1
-        self._size += 1
-        return self._size
+        self._values.add(value)
+        n = len(self._values)
+        if n == 1:
+            self._median_key, self._median_offset = value, 0
+        else:
+            # A smaller value pushes the cursor's element one place to the
+            # right; the median index (n - 1) // 2 grows on odd n.
+            self._move_median((n % 2) - (value < self._median_key))
+        return n
 
     def delete(self, value: int) -> bool:
         # if self._counts.get(value, 0) <= 0:
@@ -35,20 +59,105 @@ class IntegerContainerImpl(IntegerContainer):
         if self._counts.get(value, 0) == 0:
             return False
         self._counts[value] -= 1
-        self._size -= 1
         if self._counts[value] == 0:
             del self._counts[value]
-            i = bisect_left(self._keys, value)
-            self._keys.pop(i)
+        self._values.remove(value)
+        n = len(self._values)
+        if n == 0:
+            self._median_key = None
+        else:
+            # A smaller value pulls the cursor's element one place to the
+            # left; the median index (n - 1) // 2 shrinks on even n.
+            step = (value < self._median_key) - (n % 2 == 0)
+            if value == self._median_key and self._median_offset == self._counts.get(value, 0):
+                # The cursor pointed at the copy that went away; the same
+                # index now holds the first copy of the next key.
+                self._median_key = self._values[self._values.bisect_right(value)]
+                self._median_offset = 0
+            self._move_median(step)
         return True
 
+    def add_many(self, values) -> int:
+        """
+        Adds every value of an iterable or a NumPy array and returns the
+        number of integers in the container afterwards. SortedList.update
+        sorts the batch once and, for a batch of at least a quarter of the
+        container, merges by re-sorting everything: O((n + m) log(n + m)).
+        """
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        self._counts.update(values)
+        self._values.update(values)
+        self._reset_median()
+        return len(self._values)
+
+    def delete_many(self, values) -> int:
+        """
+        Attempts to delete one item per entry of an iterable or a NumPy
+        array and returns the number of values deleted. A batch of at least
+        a quarter of the container rebuilds the SortedList from the
+        remaining counts instead of removing values one at a time.
+        """
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        if len(values) * 4 < len(self._values):
+            return sum(self.delete(value) for value in values)
+
+        deleted = 0
+        for value in values:
+            if self._counts.get(value, 0) > 0:
+                self._counts[value] -= 1
+                if self._counts[value] == 0:
+                    del self._counts[value]
+                deleted += 1
+        if deleted:
+            self._values = SortedList(self._counts.elements())
+            self._reset_median()
+        return deleted
+
     def get_median(self) -> int | None:
-        if self._size == 0:
+        return self._median_key
+
+    def get_kth(self, k: int) -> int | None:
+        """
+        Returns the k-th smallest integer (0-based) in O(log n), or `None`
+        if `k` is outside the container.
+        """
+        if not 0 <= k < len(self._values):
+            return None
+        return self._values[k]
+
+    def get_quantile(self, q: float) -> int | None:
+        """
+        Returns the integer at 0-based index floor(q * (n - 1)) of the
+        sorted integers in O(log n), or `None` if the container is empty.
+        q = 0.5 gives the same integer as `get_median`.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be within [0, 1]: {q}")
+        if not self._values:
             return None
-        target = (self._size - 1) // 2
-        running = 0
-        for val in self._keys:
-            running += self._counts[val]
-            if running > target:
-                return val
-        return None
\ No newline at end of file
+        # floor(q * (n - 1)) on q as written (29/100 for 0.29): the float
+        # product lands one index low for some q once n is large.
+        num, den = Fraction(str(q)).as_integer_ratio()
+        return self._values[num * (len(self._values) - 1) // den]
+
+    def _reset_median(self) -> None:
+        if not self._values:
+            self._median_key = None
+            return
+        i = (len(self._values) - 1) // 2
+        self._median_key = self._values[i]
+        self._median_offset = i - self._values.bisect_left(self._median_key)
+
+    def _move_median(self, step: int) -> None:
+        if step > 0:
+            if self._median_offset + 1 < self._counts[self._median_key]:
+                self._median_offset += 1
+            else:
+                self._median_key = self._values[self._values.bisect_right(self._median_key)]
+                self._median_offset = 0
+        elif step < 0:
+            if self._median_offset > 0:
+                self._median_offset -= 1
+            else:
+                self._median_key = self._values[self._values.bisect_left(self._median_key) - 1]
+                self._median_offset = self._counts[self._median_key] - 1
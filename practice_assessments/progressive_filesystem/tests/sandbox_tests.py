@@ -3,6 +3,7 @@ current_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentfra
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
+import numpy as np
 from timeout_decorator import timeout
 import unittest
 from integer_container_impl import IntegerContainerImpl
@@ -35,3 +36,47 @@ class SandboxTests(unittest.TestCase):
         self.assertTrue(self.container.delete(10))
         self.assertFalse(self.container.delete(1))
         self.assertEqual(self.container.add(1), 3)
+
+    @timeout(0.4)
+    def test_median_after_keys_vanish_and_return(self):
+        for value in [4, 1, 3, 2, 2]:
+            self.container.add(value)
+        self.assertEqual(self.container.get_median(), 2)
+        self.assertTrue(self.container.delete(2))
+        self.assertTrue(self.container.delete(2))
+        self.assertEqual(self.container.get_median(), 3)
+        self.assertEqual(self.container.add(2), 4)
+        self.assertEqual(self.container.add(0), 5)
+        self.assertEqual(self.container.get_median(), 2)
+        self.assertTrue(self.container.delete(1))
+        self.assertEqual(self.container.get_median(), 2)
+
+    @timeout(0.4)
+    def test_add_many_delete_many(self):
+        self.assertEqual(self.container.add(7), 1)
+        self.assertEqual(self.container.add_many(np.array([5, 1, 9, 5])), 5)
+        self.assertEqual(self.container.get_median(), 5)
+        self.assertEqual(self.container.delete_many([5, 5, 5, 2]), 2)
+        self.assertEqual(self.container.get_median(), 7)
+        self.assertEqual(self.container.delete_many(range(10)), 3)
+        self.assertIsNone(self.container.get_median())
+
+    @timeout(0.4)
+    def test_quantiles(self):
+        self.assertIsNone(self.container.get_quantile(0.9))
+        self.container.add_many(range(1, 101))
+        self.assertEqual(self.container.get_quantile(0.5), self.container.get_median())
+        self.assertEqual(self.container.get_quantile(0.9), 90)
+        self.assertEqual(self.container.get_quantile(0.99), 99)
+        self.assertEqual(self.container.get_kth(0), 1)
+        self.assertIsNone(self.container.get_kth(100))
+
+    @timeout(0.4)
+    def test_quantiles_large(self):
+        # get_quantile only needs len() and indexing, which a range gives
+        # for 100_000_001 values without storing them.
+        self.container._values = range(100_000_001)
+        self.assertEqual(self.container.get_quantile(0.29), 29_000_000)
+        self.assertEqual(self.container.get_quantile(0.57), 57_000_000)
+        self.assertEqual(self.container.get_quantile(0.58), 58_000_000)
+        self.assertEqual(self.container.get_quantile(1), 100_000_000)
@@ -0,0 +1,94 @@
+"""
+Micro-benchmarks for main.py.
+
+Run with `python3 bench_solution.py` from this directory.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from main import parse, parseMany, solution, solutionArray, solutionFile, solutionMany
+
+_SAMPLES = ["16#ff_ff#", "2#1010_0101#", "1_000_000", "8#778#", "10#12a#", "0_1_6#DEAD_beef#", "12_34x", "#1#"]
+
+
+def _lines(n: int) -> list[str]:
+    return [_SAMPLES[i % len(_SAMPLES)] for i in range(n)]
+
+
+def bench_solution_many(n: int = 1_000_000) -> None:
+    lines = _lines(n)
+    start = time.perf_counter()
+    expected = [solution(line) for line in lines]
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    got = solutionMany(lines)
+    batch = time.perf_counter() - start
+    assert got.tolist() == expected
+    encoded = [line.encode() for line in lines]
+    start = time.perf_counter()
+    for line in encoded:
+        solution(line)
+    on_bytes = time.perf_counter() - start
+    print(f"validate {n} literals")
+    print(f"  solution() per line  {loop * 1e9 / n:6.0f} ns/line")
+    print(f"  solution() on bytes  {on_bytes * 1e9 / n:6.0f} ns/line")
+    print(f"  solutionMany         {batch * 1e9 / n:6.0f} ns/line")
+
+
+def bench_file(n: int = 1_000_000) -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("\n".join(_lines(n)) + "\n")
+    try:
+        print(f"validate a {n}-line file")
+        for name, run in (("solutionMany", lambda: solutionMany(f.name)),
+                          ("solutionFile, 1 worker", lambda: solutionFile(f.name, workers=1)),
+                          (f"solutionFile, {os.cpu_count()} workers", lambda: solutionFile(f.name))):
+            start = time.perf_counter()
+            mask = run()
+            elapsed = time.perf_counter() - start
+            print(f"  {name:28} {elapsed * 1e9 / n:6.0f} ns/line, {int(mask.sum())} valid")
+    finally:
+        os.unlink(f.name)
+
+
+def bench_solution_array(n: int = 1_000_000) -> None:
+    literals = np.array([line.encode() for line in _lines(n)])
+    start = time.perf_counter()
+    mask = solutionArray(literals)
+    elapsed = time.perf_counter() - start
+    print(f"validate {n} literals as {literals.dtype}: {elapsed * 1e9 / n:6.0f} ns/line, {int(mask.sum())} valid")
+
+
+def _validate_then_int(line: str):
+    # The two-pass pattern parse() replaces: validate, then re-scan for int().
+    if not solution(line):
+        return None
+    if line[-1] != "#":
+        return int(line.replace("_", ""))
+    base, body = line[:-1].split("#")
+    return int(body.replace("_", ""), int(base.replace("_", "")))
+
+
+def bench_parse(n: int = 1_000_000) -> None:
+    lines = _lines(n)
+    print(f"parse {n} literals")
+    expected = None
+    for name, run in (("solution() + int()", lambda: [_validate_then_int(line) for line in lines]),
+                      ("parse()", lambda: [parse(line) for line in lines]),
+                      ("parseMany", lambda: parseMany(lines))):
+        start = time.perf_counter()
+        values = run()
+        elapsed = time.perf_counter() - start
+        assert expected is None or values == expected
+        expected = values
+        print(f"  {name:20} {elapsed * 1e9 / n:6.0f} ns/line")
+
+
+if __name__ == "__main__":
+    bench_solution_many()
+    bench_file()
+    bench_solution_array()
+    bench_parse()
@@ -1,50 +1,360 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+import numpy as np
+
+
+# Value of every byte as a digit: 0-15 for 0-9, a-f and A-F, plus
+# three classes for the bytes the literal syntax cares about.
+_UNDERSCORE, _HASH, _OTHER = 16, 17, 18
+_DIGIT_VALUE = bytearray([_OTHER]) * 256
+for _c in range(10):
+    _DIGIT_VALUE[ord('0') + _c] = _c
+for _c in range(6):
+    _DIGIT_VALUE[ord('a') + _c] = _DIGIT_VALUE[ord('A') + _c] = 10 + _c
+_DIGIT_VALUE[ord('_')] = _UNDERSCORE
+_DIGIT_VALUE[ord('#')] = _HASH
+_DIGIT_VALUE = bytes(_DIGIT_VALUE)
+
+# DFA states. Until the first '#' the line may be a plain decimal or the
+# base of a based literal, so the prefix states remember the base read so
+# far, saturating at _BIG for anything above 16. After the '#' the states
+# remember the base the body is checked against, up to the closing '#'.
+_DEAD, _START = 0, 1
+_PREFIX = 2                  # _PREFIX + v: digits read, base so far v <= 16
+_BIG = _PREFIX + 17          # digits read, base so far > 16
+_OPEN = _BIG + 1             # _OPEN + b - 2: after '#', no body digit yet
+_BODY = _OPEN + 15           # _BODY + b - 2: at least one body digit
+_END = _BODY + 15            # _END + b - 2: closing '#' read
+_STATES = _END + 15
+_ACCEPTING = frozenset([*range(_PREFIX, _BIG + 1), *range(_END, _STATES)])
+
+
+def _transition(state, value):
+    if state == _START or _PREFIX <= state <= _BIG:
+        if value == _UNDERSCORE:
+            return state
+        if value == _HASH:
+            base = state - _PREFIX
+            return _OPEN + base - 2 if state != _START and 2 <= base <= 16 else _DEAD
+        if value >= 10:
+            return _DEAD
+        if state == _BIG:
+            return _BIG
+        base = 0 if state == _START else state - _PREFIX
+        return min(_PREFIX + base * 10 + value, _BIG)
+    if _OPEN <= state < _END:
+        opened = state < _BODY
+        base = state - (_OPEN if opened else _BODY) + 2
+        if value == _UNDERSCORE:
+            return state
+        if value == _HASH:
+            return _DEAD if opened else _END + base - 2
+        return _BODY + base - 2 if value < base else _DEAD
+    return _DEAD
+
+
+# One 256-entry row per state, indexed by byte: the DFA takes a single
+# table lookup per byte. This table is the only definition of the
+# grammar; every validator below runs it.
+_TRANSITIONS = [bytes(_transition(state, value) for value in _DIGIT_VALUE) for state in range(_STATES)]
+
+
 def solution(line):
-    atLeastOneDigit = False
-    if line[len(line) - 1] == '#':
-        i = 0
-        base = 0
-
-        # missing code start
-        hasBaseDigit = False
-        while i < len(line) and line[i] != '#':
-            if line[i] == '_':
-                i += 1
-                continue
-            if '0' <= line[i] <= '9':
-                base = base * 10 + (ord(line[i]) - ord('0'))
-                hasBaseDigit = True
-            else:
-                return False
-            i += 1
-
-        if i == len(line) or line[i] != '#':
-            return False
-        if not hasBaseDigit:
-            return False
-        # missing code start
-
-        if base < 2 or base > 16:
-            return False
-        i += 1
-        while i < len(line) - 1:
-            if line[i] != '_':
-                digit = -1
-                if 'a' <= line[i] and line[i] <= 'f':
-                    digit = ord(line[i]) - ord('a') + 10
-                if 'A' <= line[i] and line[i] <= 'F':
-                    digit = ord(line[i]) - ord('A') + 10
-                if '0' <= line[i] and line[i] <= '9':
-                    digit = ord(line[i]) - ord('0')
-                if 0 <= digit and digit < base:
-                    atLeastOneDigit = True
-                else:
-                    return False
-            i += 1
+    """
+    Returns whether `line` is a plain decimal literal (`1_000`) or a
+    based one (`16#ff_ff#`, base 2..16), underscores allowed anywhere.
+    `line` may be a str, bytes, bytearray or a memoryview of bytes, e.g.
+    a slice of a larger buffer, which is validated without decoding.
+    """
+    return _finalState(line) in _ACCEPTING
+
+
+def parse(line):
+    """
+    Returns the value of the literal `line`, or None if solution(line)
+    is False. Validation and the value come from the same pass over the
+    DFA; `line` may be a str or bytes-like, as for solution().
+    """
+    if isinstance(line, str):
+        line = line.encode('ascii', 'replace')
+    transitions = _TRANSITIONS
+    digitValue = _DIGIT_VALUE
+    state = _START
+    value = 0
+    radix = 10
+    for byte in line:
+        state = transitions[state][byte]
+        digit = digitValue[byte]
+        if digit < radix:
+            value = value * radix + digit
+        elif state == _DEAD:
+            return None
+        elif digit == _HASH and state < _BODY:
+            # The base just ended: `value` was the base, the body starts.
+            radix = state - _OPEN + 2
+            value = 0
+    return value if state in _ACCEPTING else None
+
+
+def _finalState(line):
+    if isinstance(line, str):
+        # Any non-ASCII character becomes '?', which is never valid.
+        line = line.encode('ascii', 'replace')
+    transitions = _TRANSITIONS
+    state = _START
+    for byte in line:
+        state = transitions[state][byte]
+    return state
+
+
+_CHUNK_LINES = 1 << 16
+_READ_BYTES = 1 << 20
+# Longer lines are run through _finalState() one by one rather than
+# widening the byte matrix of their whole chunk.
+_MATRIX_WIDTH = 64
+
+
+def solutionMany(lines, chunkSize=_CHUNK_LINES):
+    """
+    Validates many literals at once and returns a NumPy boolean array,
+    one entry per line, equal to solution(line) for each line.
+
+    `lines` is any iterable of strings or bytes, or a path (str or
+    os.PathLike) to a file with one literal per line, read as bytes with
+    its "\n" or "\r\n" line endings dropped. Lines are validated
+    `chunkSize` at a time by the vectorised DFA of solutionArray, so a
+    file never needs to fit in memory as a list of strings.
+    """
+    return _validateChunks(_iterLines(lines), chunkSize)
+
+
+def parseMany(lines):
+    """
+    Returns a list with parse(line) for every line; `lines` is an
+    iterable of strings or bytes, or a path, as for solutionMany.
+
+    Lines are parsed in chunks by the vectorised DFA of solutionMany,
+    which accumulates every row's value in the same column pass that
+    validates it. Lines too long for that byte matrix, and values with
+    more digits than an int64 is sure to hold, go through parse().
+    """
+    values = []
+    for chunk in _iterChunks(_iterLines(lines), _CHUNK_LINES):
+        values.extend(_parseChunk(chunk))
+    return values
+
+
+def _iterLines(lines):
+    if isinstance(lines, (str, os.PathLike)):
+        # Bytes go to the DFA as they are, so a stray non-UTF-8 byte makes
+        # its line invalid, as in solutionFile, instead of failing to decode.
+        # Whole blocks are split at once, like the shards of solutionFile.
+        with open(lines, 'rb') as f:
+            tail = b''
+            while block := f.read(_READ_BYTES):
+                pieces = (tail + block).replace(b'\r\n', b'\n').split(b'\n')
+                tail = pieces.pop()
+                yield from pieces
+            if tail:
+                yield tail
     else:
-        for i in range(len(line)):
-            if line[i] != '_':
-                if '0' <= line[i] and line[i] <= '9':
-                    atLeastOneDigit = True
-                else:
-                    return False
-    return atLeastOneDigit
+        yield from lines
+
+
+def _iterChunks(lines, chunkSize):
+    while True:
+        chunk = list(islice(lines, chunkSize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _validateChunks(lines, chunkSize=_CHUNK_LINES):
+    chunks = [_ACCEPTING_MASK[_finalStates(chunk)] for chunk in _iterChunks(lines, chunkSize)]
+    if not chunks:
+        return np.zeros(0, dtype=bool)
+    return np.concatenate(chunks)
+
+
+# The DFA as one flat array for the vectorised path, holding the offset
+# (state * 256) of each next state's row so a step is a single add and
+# gather. A NUL byte is S-dtype padding there, so it leaves the state
+# alone; NULs inside a literal are rejected separately.
+_PADDED_TRANSITIONS = np.frombuffer(b''.join(_TRANSITIONS), dtype=np.uint8).reshape(_STATES, 256).astype(np.intp)
+_PADDED_TRANSITIONS[:, 0] = np.arange(_STATES)
+_PADDED_TRANSITIONS = (_PADDED_TRANSITIONS * 256).ravel()
+_ACCEPTING_MASK = np.isin(np.arange(_STATES), list(_ACCEPTING))
+# The base of the literal each accepting state ends, 0 for the others.
+_FINAL_BASE = np.zeros(_STATES, dtype=np.intp)
+_FINAL_BASE[_PREFIX:_BIG + 1] = 10
+_FINAL_BASE[_END:_STATES] = np.arange(2, 17)
+# For the values parseMany accumulates alongside the DFA: the radix a
+# digit read into each state counts in (0 where no digit can be read),
+# whether the state keeps the value so far (not right after the base's
+# '#'), and the most digits of each base an int64 always holds.
+_RADIX = np.zeros(_STATES, dtype=np.int64)
+_RADIX[_START:_BIG + 1] = 10
+for _b in range(2, 17):
+    _RADIX[[_OPEN + _b - 2, _BODY + _b - 2, _END + _b - 2]] = _b
+_KEEP = np.ones(_STATES, dtype=np.int64)
+_KEEP[_OPEN:_BODY] = 0
+_INT64_DIGITS = np.array([0, 0] + [max(d for d in range(64) if b ** d <= 2 ** 63) for b in range(2, 17)])
+_DIGIT_ARRAY = np.frombuffer(_DIGIT_VALUE, dtype=np.uint8).astype(np.int64)
+
+
+def solutionArray(literals, chunkSize=_CHUNK_LINES):
+    """
+    Validates a NumPy `S`-dtype array of literals, or anything np.asarray
+    turns into one, and returns a boolean mask of the same shape equal to
+    solution() on every element.
+
+    The array is viewed as a (rows, itemsize) byte matrix and the DFA
+    advances every row by one column per step, so the Python overhead is
+    per column, not per byte. Rows are processed `chunkSize` at a time
+    to bound the temporaries.
+    """
+    literals = np.asarray(literals, dtype=np.bytes_)
+    shape = literals.shape
+    literals = literals.reshape(-1)
+    valid = np.zeros(len(literals), dtype=bool)
+    if literals.dtype.itemsize == 0:
+        return valid.reshape(shape)
+    for start in range(0, len(literals), chunkSize):
+        valid[start:start + chunkSize] = _ACCEPTING_MASK[_matrixStates(literals[start:start + chunkSize])]
+    return valid.reshape(shape)
+
+
+def _matrixStates(literals, withValues=False):
+    # Final DFA state of every element of a 1-D `S`-dtype array. With
+    # `withValues`, also the value parse() would return and its digit
+    # count, the value wrapping modulo 2 ** 64 once it outgrows an int64.
+    width = literals.dtype.itemsize
+    rows = np.ascontiguousarray(literals).view(np.uint8).reshape(-1, width)
+    table = _PADDED_TRANSITIONS
+    offset = np.full(len(rows), _START * 256, dtype=np.intp)
+    value = digits = np.zeros(len(rows), dtype=np.int64)
+    for column in np.ascontiguousarray(rows.T):
+        offset = table[offset + column]
+        if withValues:
+            state = offset >> 8
+            radix = _RADIX[state]
+            digit = _DIGIT_ARRAY[column]
+            counted = digit < radix
+            keep = _KEEP[state]
+            value = np.where(counted, value * radix + digit, value * keep)
+            digits = np.where(counted, digits + 1, digits * keep)
+    states = offset >> 8
+    # A NUL followed by a non-NUL byte is inside the literal, not padding.
+    states[((rows[:, :-1] == 0) & (rows[:, 1:] != 0)).any(axis=1)] = _DEAD
+    if withValues:
+        return states, value, digits
+    return states
+
+
+def _packLines(lines):
+    # Packs the lines of a list of str or bytes that fit the byte matrix
+    # into an `S`-dtype array. Returns it, the mask of the packed lines,
+    # and the mask of packed lines whose trailing NULs the `S` dtype
+    # dropped (the DFA rejects those lines).
+    lengths = np.fromiter(map(len, lines), dtype=np.intp, count=len(lines))
+    short = lengths <= _MATRIX_WIDTH
+    if not short.all():
+        lines = [lines[i] for i in np.flatnonzero(short).tolist()]
+        lengths = lengths[short]
+    try:
+        literals = np.array(lines, dtype=np.bytes_)
+    except UnicodeEncodeError:
+        # As in solution(), any non-ASCII character becomes '?'.
+        literals = np.array([line.encode('ascii', 'replace') if isinstance(line, str) else line
+                             for line in lines], dtype=np.bytes_)
+    return literals, short, np.char.str_len(literals) != lengths
+
+
+def _finalStates(lines):
+    # Final DFA state of every line in a list of str or bytes.
+    literals, short, truncated = _packLines(lines)
+    packed = _matrixStates(literals)
+    packed[truncated] = _DEAD
+    states = np.empty(len(lines), dtype=np.intp)
+    states[short] = packed
+    for i in np.flatnonzero(~short).tolist():
+        states[i] = _finalState(lines[i])
+    return states
+
+
+def _parseChunk(lines):
+    # parse() of every line in a list of str or bytes.
+    literals, short, truncated = _packLines(lines)
+    states, values, digits = _matrixStates(literals, withValues=True)
+    bases = _FINAL_BASE[states]
+    bases[truncated] = 0
+    packed = values.astype(object)
+    packed[bases == 0] = None
+    parsed = np.empty(len(lines), dtype=object)
+    parsed[short] = packed
+    wrapped = np.flatnonzero(short)[(bases > 0) & (digits > _INT64_DIGITS[bases])]
+    for i in wrapped.tolist() + np.flatnonzero(~short).tolist():
+        parsed[i] = parse(lines[i])
+    return parsed.tolist()
+
+
+_SHARD_MIN_BYTES = 1 << 20
+
+
+def solutionFile(path, outPath=None, workers=None, shardBytes=None):
+    """
+    Validates a file with one literal per line across `workers`
+    processes (os.cpu_count() by default) and returns a NumPy boolean
+    array, one entry per line, in file order. With `outPath`, also
+    writes one "1" or "0" line per input line there.
+
+    The file is mmapped and cut into shards of about `shardBytes` on
+    newline boundaries; each worker mmaps it again and validates its own
+    byte range, so only the boolean results cross process boundaries.
+    Lines are validated as bytes by the vectorised DFA of solutionMany; a
+    trailing carriage return is dropped, as in a file opened in text mode.
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            valid = np.zeros(0, dtype=bool)
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # A few shards per worker keeps them all busy to the end.
+                shardBytes = shardBytes or max(_SHARD_MIN_BYTES, size // (workers * 4))
+                bounds = _shardBounds(mm, size, shardBytes)
+            starts, ends = bounds[:-1], bounds[1:]
+            if workers == 1 or len(starts) == 1:
+                shards = [_validateShard(path, start, end) for start, end in zip(starts, ends)]
+            else:
+                with ProcessPoolExecutor(workers) as executor:
+                    shards = list(executor.map(_validateShard, repeat(path), starts, ends))
+            valid = np.concatenate(shards)
+    if outPath is not None:
+        out = np.full(2 * len(valid), ord('\n'), dtype=np.uint8)
+        out[0::2] = valid + ord('0')
+        with open(outPath, 'wb') as f:
+            f.write(out.tobytes())
+    return valid
+
+
+def _shardBounds(mm, size, shardBytes):
+    # Every bound but the last sits just after a newline.
+    bounds = [0]
+    while bounds[-1] < size:
+        cut = mm.find(b'\n', min(bounds[-1] + shardBytes, size) - 1)
+        bounds.append(size if cut < 0 else cut + 1)
+    return bounds
+
+
+def _validateShard(path, start, end):
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = mm[start:end].replace(b'\r\n', b'\n').split(b'\n')
+    if not lines[-1]:
+        # The shard ends with a newline rather than a line.
+        lines.pop()
+    return _validateChunks(iter(lines))
@@ -0,0 +1,153 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from main import parse, parseMany, solution, solutionArray, solutionFile, solutionMany
+
+
+class TestSolution(unittest.TestCase):
+
+    def setUp(self):
+        self.literals = {
+            "": False,
+            "#": False,
+            "##": False,
+            "16#": False,
+            "16#ff": False,
+            "16#ff_ff#": True,
+            "0_1_6#ff#": True,
+            "2#1010_0101#": True,
+            "2#_1#": True,
+            "17#1#": False,
+            "1#0#": False,
+            "0#0#": False,
+            "2#2#": False,
+            "10#12a#": False,
+            "16#ff#0": False,
+            "#1#": False,
+            "1_000": True,
+            "_1": True,
+            "12_34x": False,
+            "1" * 100: True,
+            "16#" + "f" * 100 + "#": True,
+            "17" * 50 + "#1#": False,
+            "１２": False,
+            "16#fé#": False,
+        }
+
+    def test_truth_table(self):
+        for line, expected in self.literals.items():
+            with self.subTest(line=line):
+                self.assertEqual(solution(line), expected)
+
+    def test_bytes_like(self):
+        for line, expected in self.literals.items():
+            encoded = line.encode()
+            for form in (encoded, bytearray(encoded), memoryview(encoded)):
+                with self.subTest(line=line, form=type(form).__name__):
+                    self.assertEqual(solution(form), expected)
+
+    def test_parse(self):
+        self.assertEqual(parse("0_1_6#ff#"), 255)
+        self.assertEqual(parse(b"2#1010_0101#"), 165)
+        self.assertEqual(parse("1_000"), 1000)
+        self.assertEqual(parse("10#99#"), 99)
+        self.assertIsNone(parse("2#2#"))
+        self.assertIsNone(parse(""))
+        lines = list(self.literals) + ["1\0", "1\x002"]
+        expected = [parse(line) for line in lines]
+        self.assertEqual(parseMany(lines), expected)
+        self.assertEqual(parseMany([line.encode() for line in lines]), expected)
+
+    def test_parse_many_large_values(self):
+        # Around the int64 limit of each base, on both sides of the width
+        # of the vectorised path, and past int()'s 4300-digit limit.
+        lines = ["9" * 18, "9" * 19, "16#" + "f" * 15 + "#", "16#" + "f" * 16 + "#",
+                 "2#" + "1" * 59 + "#", "2#" + "1" * 64 + "#", "1_" * 40 + "1", "7" * 5000]
+        expected = [int("9" * 18), int("9" * 19), 16 ** 15 - 1, 16 ** 16 - 1,
+                    2 ** 59 - 1, 2 ** 64 - 1, int("1" * 41), (10 ** 5000 - 1) // 9 * 7]
+        self.assertEqual(parseMany(lines), expected)
+        self.assertEqual(parseMany([line.encode() for line in lines]), expected)
+
+    def test_many(self):
+        lines = list(self.literals) + ["1\0", "1\x002", "\0"]
+        expected = [solution(line) for line in lines]
+        self.assertEqual(expected[-3:], [False, False, False])
+        self.assertEqual(solutionMany(lines).tolist(), expected)
+        self.assertEqual(solutionMany(lines, chunkSize=3).tolist(), expected)
+        self.assertEqual(solutionMany([line.encode() for line in lines]).tolist(), expected)
+        self.assertEqual(solutionMany([]).tolist(), [])
+
+    def test_many_from_path(self):
+        # A stray non-UTF-8 byte, CRLF and LF endings, no final newline,
+        # read whole and across tiny read blocks.
+        data = b"16#ff#\r\n\xff12\n1_000\r\n\n2#2#\r\n7"
+        lines = [b"16#ff#", b"\xff12", b"1_000", b"", b"2#2#", b"7"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "literals.txt")
+            with open(path, "wb") as f:
+                f.write(data)
+            for readBytes in (1 << 20, 1, 4):
+                with self.subTest(readBytes=readBytes), patch("main._READ_BYTES", readBytes):
+                    self.assertEqual(solutionMany(path).tolist(), [solution(line) for line in lines])
+                    self.assertEqual(parseMany(path), [255, None, 1000, None, None, 7])
+            self.assertEqual(solutionMany(pathlib.Path(path)).tolist(), [True, False, True, False, False, True])
+
+    def test_array(self):
+        ascii = [line for line in self.literals if line.isascii()]
+        literals = np.array([line.encode() for line in ascii])
+        expected = [self.literals[line] for line in ascii]
+        self.assertEqual(solutionArray(literals).tolist(), expected)
+        self.assertEqual(solutionArray(literals, chunkSize=5).tolist(), expected)
+        # Trailing NULs are padding, interior ones are part of the literal.
+        self.assertEqual(solutionArray([b"16#ff#\0\0", b"1\x002", b"\0"]).tolist(), [True, False, False])
+        self.assertEqual(solutionArray(literals.reshape(1, -1)).shape, (1, len(ascii)))
+        self.assertEqual(solutionArray(np.array([], dtype="S8")).tolist(), [])
+
+    def test_file(self):
+        ascii = [line for line in self.literals if line.isascii()]
+        expected = [self.literals[line] for line in ascii]
+        crlf = "".join(line + ("\r\n" if i % 2 else "\n") for i, line in enumerate(ascii))
+        for name, text in (("lf", "\n".join(ascii) + "\n"),
+                           ("crlf", crlf),
+                           ("no trailing newline", "\n".join(ascii))):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "literals.txt")
+                outPath = os.path.join(tmp, "valid.txt")
+                with open(path, "w", newline="") as f:
+                    f.write(text)
+                self.assertEqual(solutionMany(path).tolist(), expected, name)
+                for workers, shardBytes in ((1, None), (1, 1), (2, 1), (2, 16)):
+                    with self.subTest(name=name, workers=workers, shardBytes=shardBytes):
+                        valid = solutionFile(path, outPath, workers=workers, shardBytes=shardBytes)
+                        self.assertEqual(valid.tolist(), expected)
+                        with open(outPath) as f:
+                            self.assertEqual(f.read().split(), [str(int(ok)) for ok in expected])
+
+    def test_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "empty.txt")
+            open(path, "w").close()
+            self.assertEqual(solutionFile(path).tolist(), [])
+            self.assertEqual(solutionMany(path).tolist(), [])
+            self.assertEqual(parseMany(path), [])
+
+    def test_file_bytes(self):
+        # Lines that do not decode, and a final CR with no LF, which
+        # stays part of its line.
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "literals.txt")
+            with open(path, "wb") as f:
+                f.write(b"\xff12\n16#ff#\n1_0\xe9\r\n1\r")
+            expected = [False, True, False, False]
+            for workers, shardBytes in ((1, None), (2, 1)):
+                self.assertEqual(solutionFile(path, workers=workers, shardBytes=shardBytes).tolist(), expected)
+            self.assertEqual(solutionMany(path).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()